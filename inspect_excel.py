@@ -0,0 +1,297 @@
+"""
+Fast inspection of converter output without loading whole workbooks.
+
+Sheets are streamed row by row with openpyxl's read-only mode, and per-column
+counts, head, tail and filtering are all computed in a single pass. With
+--use-sidecar, a columnar sidecar (<name>.parquet or <name>.feather) next to
+the workbook that is at least as new is read instead of the main data sheet.
+
+Usage:
+    python inspect_excel.py output.xlsx
+    python inspect_excel.py output.xlsx --head 20 --tail 5
+    python inspect_excel.py output.xlsx --filter "CNA$" --tail 10
+    python inspect_excel.py output.xlsx --sheet Summary --all
+    python inspect_excel.py output.xlsx --use-sidecar
+"""
+import argparse
+import os
+import re
+import sys
+from collections import deque
+
+from openpyxl import load_workbook
+
+try:
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+MAIN_SHEET = 'Registry_Staff'
+SIDECAR_EXTENSIONS = ['.parquet', '.feather']
+
+# Bookkeeping columns that are not staff categories
+ID_COLUMNS = ['Row_Number', 'Page', 'Row_Type']
+
+
+def is_empty(value):
+    """
+    Check whether a cell value counts as empty (None, '' or NaN).
+    """
+    return value is None or value == '' or (isinstance(value, float) and value != value)
+
+
+def find_sidecar(excel_path):
+    """
+    Find a columnar sidecar for a workbook.
+
+    Args:
+        excel_path (str): Path to the workbook
+
+    Returns:
+        str: Path of the newest usable sidecar, or None
+    """
+    if pyarrow is None:
+        return None
+
+    stem = os.path.splitext(excel_path)[0]
+    workbook_mtime = os.path.getmtime(excel_path) if os.path.exists(excel_path) else 0
+
+    for extension in SIDECAR_EXTENSIONS:
+        path = stem + extension
+        if os.path.exists(path) and os.path.getmtime(path) >= workbook_mtime:
+            return path
+    return None
+
+
+def _iter_arrow_batches(batches):
+    for batch in batches:
+        columns = [column.to_pylist() for column in batch.columns]
+        yield from zip(*columns)
+
+
+def open_workbook(excel_path):
+    """
+    Open a workbook for streaming (read-only, cached values).
+
+    Args:
+        excel_path (str): Path to the workbook
+
+    Returns:
+        openpyxl.Workbook: Read-only workbook; close it when done
+    """
+    return load_workbook(excel_path, read_only=True, data_only=True)
+
+
+def sheet_rows(worksheet):
+    """
+    Stream a worksheet as a header row and row tuples.
+
+    Args:
+        worksheet: Worksheet of a workbook from open_workbook
+
+    Returns:
+        tuple: (columns, rows) where rows is an iterator of tuples
+    """
+    row_iter = worksheet.iter_rows(values_only=True)
+    columns = [str(value) if value is not None else '' for value in next(row_iter, ())]
+    return columns, row_iter
+
+
+def open_rows(path, sheet=None, use_sidecar=False, workbook=None):
+    """
+    Open a sheet or sidecar as a stream of rows.
+
+    Args:
+        path (str): Workbook (.xlsx) or sidecar (.parquet, .feather)
+        sheet (str): Sheet name (defaults to the main data sheet)
+        use_sidecar (bool): Read the main sheet from a sidecar when present
+        workbook: Workbook already opened with open_workbook, left open for
+            the caller to close (optional)
+
+    Returns:
+        tuple: (columns, rows, source) where rows is an iterator of tuples
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in ('.xlsx', '.xlsm') and use_sidecar and sheet in (None, MAIN_SHEET):
+        sidecar = find_sidecar(path)
+        if sidecar:
+            print(f"Reading {MAIN_SHEET} from sidecar {sidecar} instead of {path}")
+            return open_rows(sidecar)
+
+    if extension == '.parquet':
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        columns = parquet_file.schema_arrow.names
+        return columns, _iter_arrow_batches(parquet_file.iter_batches()), path
+
+    if extension == '.feather':
+        table = pyarrow.feather.read_table(path, memory_map=True)
+        return table.column_names, _iter_arrow_batches(table.to_batches()), path
+
+    owns_workbook = workbook is None
+    if owns_workbook:
+        workbook = open_workbook(path)
+    worksheet = workbook[sheet] if sheet else (
+        workbook[MAIN_SHEET] if MAIN_SHEET in workbook.sheetnames else workbook.worksheets[0]
+    )
+    columns, row_iter = sheet_rows(worksheet)
+
+    def rows():
+        try:
+            yield from row_iter
+        finally:
+            if owns_workbook:
+                workbook.close()
+    return columns, rows(), f"{path} [{worksheet.title}]"
+
+
+def scan_rows(columns, rows, head=0, tail=0, pattern=None, stop_after_head=False):
+    """
+    Count, filter and sample rows in a single pass.
+
+    Args:
+        columns (list): Column names
+        rows (iterable): Row tuples
+        head (int): Number of matching rows to keep from the start
+        tail (int): Number of matching rows to keep from the end
+        pattern (str): Regular expression; only rows with a matching cell
+            are kept and counted
+        stop_after_head (bool): Stop reading once the head is filled
+
+    Returns:
+        dict: 'total', 'matched', 'pages', 'counts' (non-empty cells per
+            column among matched rows), 'head' and 'tail' rows
+    """
+    regex = re.compile(pattern) if pattern else None
+    counts = [0] * len(columns)
+    page_index = columns.index('Page') if 'Page' in columns else None
+    pages = set()
+    head_rows = []
+    tail_rows = deque(maxlen=tail) if tail else None
+    total = 0
+    matched = 0
+
+    for row in rows:
+        total += 1
+        if regex and not any(not is_empty(value) and regex.search(str(value)) for value in row):
+            continue
+
+        matched += 1
+        for i, value in enumerate(row[:len(counts)]):
+            if not is_empty(value):
+                counts[i] += 1
+        if page_index is not None and page_index < len(row):
+            pages.add(row[page_index])
+
+        if len(head_rows) < head:
+            head_rows.append(row)
+            if stop_after_head and len(head_rows) == head:
+                break
+        if tail_rows is not None:
+            tail_rows.append(row)
+
+    return {
+        'total': total,
+        'matched': matched,
+        'pages': len(pages),
+        'counts': dict(zip(columns, counts)),
+        'head': head_rows,
+        'tail': list(tail_rows) if tail_rows is not None else [],
+    }
+
+
+def format_row(row, width=25):
+    """
+    Format a row as fixed-width cells separated by pipes.
+    """
+    cells = ['' if is_empty(value) else str(value) for value in row]
+    return ' | '.join(f"{cell[:width]:<{width}}" for cell in cells).rstrip()
+
+
+def list_sheets(workbook):
+    """
+    List the sheets of a workbook with their stored dimensions.
+
+    Args:
+        workbook: Workbook from open_workbook
+
+    Returns:
+        list: (sheet_name, max_row, max_column) tuples
+    """
+    return [(ws.title, ws.max_row, ws.max_column) for ws in workbook.worksheets]
+
+
+def category_columns(columns):
+    """
+    Columns that hold staff or table values rather than row bookkeeping.
+    """
+    return [column for column in columns if column and column not in ID_COLUMNS]
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Stream converter output and print counts and sample rows.")
+    parser.add_argument('path', nargs='?', default="Document250616132824_v3.xlsx",
+                        help="Workbook or columnar sidecar to inspect")
+    parser.add_argument('--sheet', default=None, help="Sheet to read (default: Registry_Staff)")
+    parser.add_argument('--head', type=int, default=10, help="Rows to show from the start")
+    parser.add_argument('--tail', type=int, default=0, help="Rows to show from the end")
+    parser.add_argument('--all', action='store_true', help="Show every matching row")
+    parser.add_argument('--filter', default=None, metavar='REGEX', help="Only rows with a cell matching REGEX")
+    parser.add_argument('--no-counts', action='store_true',
+                        help="Skip counts and stop reading once the head is shown")
+    parser.add_argument('--use-sidecar', action='store_true',
+                        help="Read the main sheet from a newer <name>.parquet or <name>.feather if present")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"File not found: {args.path}")
+        sys.exit(1)
+
+    # The sheet list and the rows come from the same open workbook
+    workbook = None
+    if args.path.lower().endswith(('.xlsx', '.xlsm')):
+        workbook = open_workbook(args.path)
+        print(f"Excel File: {args.path}")
+        for name, max_row, max_column in list_sheets(workbook):
+            print(f"  Sheet {name}: {max_row} rows x {max_column} columns (stored dimensions)")
+        print("=" * 60)
+
+    try:
+        columns, rows, source = open_rows(args.path, args.sheet, use_sidecar=args.use_sidecar,
+                                          workbook=workbook)
+        head = sys.maxsize if args.all else args.head
+        result = scan_rows(columns, rows, head=head, tail=0 if args.all else args.tail, pattern=args.filter,
+                           stop_after_head=args.no_counts and not args.tail)
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+    print(f"Source: {source}")
+    print(f"Columns: {columns}")
+    if not args.no_counts:
+        print(f"Rows: {result['total']}" + (f" ({result['matched']} matching)" if args.filter else ''))
+        if result['pages']:
+            print(f"Pages: {result['pages']}")
+        for column in category_columns(columns):
+            print(f"  {column}: {result['counts'][column]}")
+
+    if result['head']:
+        print(f"\nFirst {len(result['head'])} rows:")
+        print(format_row(columns))
+        for row in result['head']:
+            print(format_row(row))
+
+    if result['tail']:
+        print(f"\nLast {len(result['tail'])} rows:")
+        print(format_row(columns))
+        for row in result['tail']:
+            print(format_row(row))
+
+
+if __name__ == "__main__":
+    main()
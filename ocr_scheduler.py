@@ -0,0 +1,181 @@
+"""
+Adaptive scheduler for page OCR jobs.
+
+Pages are rendered on the calling thread (PyMuPDF documents are not thread
+safe) and handed to a thread pool, where each job runs its own Tesseract
+process. The number of jobs in flight follows measured CPU utilization and
+memory use, every attempt has a time budget, and a page that runs out of time
+has its Tesseract process killed and is retried with a cheaper profile.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Attempts per page, from best quality to fastest: (zoom, tesseract config).
+# --psm 6 treats the page as one block of text and skips layout analysis.
+DEFAULT_PROFILES = [
+    (2, ''),
+    (1.5, '--psm 6'),
+    (1, '--psm 6'),
+]
+
+
+class OCRTimeout(RuntimeError):
+    """
+    Raised by an OCR job when Tesseract exceeded its time budget.
+    """
+
+
+class AdaptiveOCRScheduler:
+    def __init__(self, max_workers=None, page_timeout=120, profiles=None,
+                 cpu_high=90, memory_high=85, rss_limit_mb=None, sample_interval=1.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers (int): Upper bound on concurrent OCR jobs (defaults
+                to the number of CPUs)
+            page_timeout (float): Seconds allowed per attempt before the
+                Tesseract process is killed
+            profiles (list): (zoom, config) attempts per page, best first
+            cpu_high (float): System CPU percent above which concurrency shrinks
+            memory_high (float): System memory percent above which concurrency
+                is halved
+            rss_limit_mb (float): Resident memory of this process and its
+                Tesseract children above which concurrency is halved (optional)
+            sample_interval (float): Seconds between resource measurements
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.page_timeout = page_timeout
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.cpu_high = cpu_high
+        self.memory_high = memory_high
+        self.rss_limit_mb = rss_limit_mb
+        self.sample_interval = sample_interval
+
+        if psutil is None:
+            print("psutil not installed, running a fixed number of OCR workers")
+            self.current_workers = self.max_workers
+        else:
+            # Start small and grow while the machine has headroom
+            self.current_workers = 1
+            psutil.cpu_percent(interval=None)
+        self._last_sample = time.monotonic()
+
+    def _adjust_workers(self):
+        """
+        Grow or shrink the concurrency limit from CPU and memory measurements.
+        """
+        if psutil is None or time.monotonic() - self._last_sample < self.sample_interval:
+            return
+        self._last_sample = time.monotonic()
+
+        cpu = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory().percent
+        over_rss = self.rss_limit_mb is not None and self._process_rss_mb() > self.rss_limit_mb
+
+        previous = self.current_workers
+        if memory > self.memory_high or over_rss:
+            self.current_workers = max(1, self.current_workers // 2)
+        elif cpu > self.cpu_high:
+            self.current_workers = max(1, self.current_workers - 1)
+        elif self.current_workers < self.max_workers:
+            self.current_workers += 1
+
+        if self.current_workers < previous:
+            print(f"OCR workers reduced to {self.current_workers} "
+                  f"(CPU {cpu:.0f}%, memory {memory:.0f}%, RSS {self._process_rss_mb():.0f} MB)")
+
+    def _process_rss_mb(self):
+        """
+        Resident memory of this process and its Tesseract children, in MB.
+        """
+        if psutil is None:
+            return 0
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+
+    def run(self, jobs, render, ocr):
+        """
+        Run OCR for a set of pages.
+
+        Jobs are ordered by priority and then by page area, largest first, so
+        the slowest pages start early and do not stretch the tail.
+
+        Args:
+            jobs (list): Dicts with 'page_num', 'area' and optional 'priority'
+            render (callable): render(page_num, zoom) -> image, called on the
+                calling thread
+            ocr (callable): ocr(image, config, timeout) -> result, called on
+                worker threads; raises OCRTimeout when out of time
+
+        Returns:
+            dict: page_num -> (result, zoom), result is None if every attempt failed
+        """
+        queue = sorted(jobs, key=lambda job: (job.get('priority', 0), -job['area']))
+        queue = [(job['page_num'], 0) for job in queue]
+
+        # Parallel Tesseract processes should not each spawn a thread per
+        # core. pytesseract hands os.environ to every process it starts, so
+        # the limit is set for the duration of the pool only.
+        previous_limit = os.environ.get('OMP_THREAD_LIMIT')
+        if self.max_workers > 1 and previous_limit is None:
+            os.environ['OMP_THREAD_LIMIT'] = '1'
+        try:
+            return self._run_pool(queue, render, ocr)
+        finally:
+            if previous_limit is None:
+                os.environ.pop('OMP_THREAD_LIMIT', None)
+
+    def _run_pool(self, queue, render, ocr):
+        """
+        Run queued (page_num, attempt) jobs; see run.
+        """
+        results = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queue or running:
+                self._adjust_workers()
+
+                while queue and len(running) < self.current_workers:
+                    page_num, attempt = queue.pop(0)
+                    zoom, config = self.profiles[attempt]
+                    image = render(page_num, zoom)
+                    future = executor.submit(ocr, image, config, self.page_timeout)
+                    running[future] = (page_num, attempt)
+
+                done, _ = wait(list(running), timeout=self.sample_interval, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    page_num, attempt = running.pop(future)
+                    zoom = self.profiles[attempt][0]
+                    try:
+                        results[page_num] = (future.result(), zoom)
+                        continue
+                    except OCRTimeout:
+                        reason = f"timed out after {self.page_timeout}s"
+                    except Exception as e:
+                        reason = str(e)
+
+                    if attempt + 1 < len(self.profiles):
+                        print(f"OCR on page {page_num + 1} {reason}, retrying with a faster profile")
+                        # Retries go to the front so a stuck page does not end up last
+                        queue.insert(0, (page_num, attempt + 1))
+                    else:
+                        print(f"OCR on page {page_num + 1} {reason}, giving up")
+                        results[page_num] = (None, zoom)
+
+        return results
@@ -0,0 +1,497 @@
+"""
+Sharded PDF to Excel conversion over a shared directory.
+
+A coordinator splits each PDF into page-range shards and publishes them as
+small JSON files in a queue directory that every worker can reach (a local
+temp directory or a network share). Workers claim shards with an atomic
+rename, keep their lease alive with heartbeats, and write the extracted page
+text back to the queue. The merge step assembles each document's pages in
+order and writes the workbook with PDFToExcelConverter.
+
+Queue layout:
+    documents/  one manifest per PDF (source path, output path, shard ids)
+    pending/    shards waiting for a worker
+    leased/     shards being processed, as <shard>@<owner>.json; the file
+                mtime is the heartbeat
+    done/       extracted page text for finished shards
+    failed/     shards that ran out of attempts
+    merged/     manifests of documents whose workbook has been written
+
+Usage:
+    python pdf_to_excel_cluster.py publish QUEUE_DIR a.pdf b.pdf --shard-size 10
+    python pdf_to_excel_cluster.py worker QUEUE_DIR --processes 4
+    python pdf_to_excel_cluster.py merge QUEUE_DIR
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+
+import fitz  # PyMuPDF
+
+from pdf_to_excel_pymupdf import PDFToExcelConverter
+
+QUEUE_DIRS = ['documents', 'pending', 'leased', 'done', 'failed', 'merged']
+
+# Seconds between lease heartbeats, and how stale a lease may get before
+# another worker takes the shard back
+HEARTBEAT_INTERVAL = 10
+LEASE_TIMEOUT = 60
+
+# Idle workers poll the queue this often (seconds)
+POLL_INTERVAL = 2
+
+MAX_ATTEMPTS = 3
+
+
+def _queue_path(queue_dir, folder, name=''):
+    return os.path.join(queue_dir, folder, name)
+
+
+def _write_json(path, data):
+    """
+    Write JSON so readers never see a partial file.
+
+    Args:
+        path (str): Destination path
+        data (dict): JSON-serializable data
+    """
+    tmp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _lease_name(name, owner):
+    """
+    Name of a lease file, unique to the worker that holds it.
+    """
+    return f"{name[:-len('.json')]}@{owner}.json"
+
+
+def _shard_name(lease_name):
+    """
+    Name of the pending shard file a lease was claimed from.
+    """
+    return lease_name.rsplit('@', 1)[0] + '.json'
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _document_id(pdf_path):
+    """
+    Build a stable queue id for a PDF from its absolute path.
+    """
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    digest = hashlib.sha1(os.path.abspath(pdf_path).encode('utf-8')).hexdigest()[:10]
+    return f"{stem}-{digest}"
+
+
+def init_queue(queue_dir):
+    """
+    Create the queue directory layout.
+
+    Args:
+        queue_dir (str): Shared queue directory
+    """
+    for folder in QUEUE_DIRS:
+        os.makedirs(_queue_path(queue_dir, folder), exist_ok=True)
+
+
+def publish(queue_dir, pdf_paths, shard_size=10, output_dir=None):
+    """
+    Split PDFs into page-range shards and publish them to the queue.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        pdf_paths (list): PDF files to convert
+        shard_size (int): Number of pages per shard
+        output_dir (str): Directory for the merged workbooks (optional,
+            defaults to next to each PDF)
+
+    Returns:
+        int: Number of shards published
+    """
+    init_queue(queue_dir)
+    published = 0
+
+    for pdf_path in pdf_paths:
+        pdf_path = os.path.abspath(pdf_path)
+        doc = fitz.open(pdf_path)
+        page_count = len(doc)
+        doc.close()
+
+        doc_id = _document_id(pdf_path)
+        output_name = os.path.splitext(os.path.basename(pdf_path))[0] + '.xlsx'
+        output_path = os.path.join(output_dir or os.path.dirname(pdf_path), output_name)
+
+        shard_ids = []
+        for first_page in range(0, page_count, shard_size):
+            last_page = min(first_page + shard_size, page_count)
+            shard_id = f"{doc_id}-{first_page:05d}-{last_page:05d}"
+            shard_ids.append(shard_id)
+            _write_json(_queue_path(queue_dir, 'pending', f"{shard_id}.json"), {
+                'shard_id': shard_id,
+                'doc_id': doc_id,
+                'pdf_path': pdf_path,
+                'first_page': first_page,
+                'last_page': last_page,
+                'attempts': 0,
+            })
+
+        # The manifest goes last so merge never sees a document without shards
+        _write_json(_queue_path(queue_dir, 'documents', f"{doc_id}.json"), {
+            'doc_id': doc_id,
+            'pdf_path': pdf_path,
+            'output_path': output_path,
+            'page_count': page_count,
+            'shards': shard_ids,
+        })
+        print(f"Published {len(shard_ids)} shard(s) for {os.path.basename(pdf_path)} ({page_count} pages)")
+        published += len(shard_ids)
+
+    return published
+
+
+def _release_lease(queue_dir, lease_path, shard=None):
+    """
+    Count a failed attempt and move a lease back to pending/, or to failed/
+    once the shard has used MAX_ATTEMPTS.
+
+    The lease is first renamed out of leased/, so only one caller can
+    release it; the others find it gone.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        lease_path (str): Path of the leased shard file
+        shard (dict): Shard description (read from the lease if not given)
+
+    Returns:
+        str: Folder the shard was moved to, or None if the lease was gone
+    """
+    release_path = f"{lease_path}.release"
+    try:
+        os.rename(lease_path, release_path)
+    except OSError:
+        return None
+
+    if shard is None:
+        shard = _read_json(release_path)
+    shard['attempts'] = shard.get('attempts', 0) + 1
+    folder = 'failed' if shard['attempts'] >= MAX_ATTEMPTS else 'pending'
+    _write_json(release_path, shard)
+    os.rename(release_path, _queue_path(queue_dir, folder, f"{shard['shard_id']}.json"))
+    return folder
+
+
+def requeue_expired(queue_dir, lease_timeout=LEASE_TIMEOUT):
+    """
+    Return shards whose lease has not been renewed to the pending folder.
+
+    An expired lease counts as a failed attempt, so a shard whose worker
+    keeps dying (e.g. killed for running out of memory) ends up in failed/.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        lease_timeout (float): Seconds without a heartbeat before a lease expires
+
+    Returns:
+        int: Number of shards requeued
+    """
+    requeued = 0
+    now = time.time()
+
+    for name in os.listdir(_queue_path(queue_dir, 'leased')):
+        if not name.endswith('.json'):
+            continue
+        lease_path = _queue_path(queue_dir, 'leased', name)
+        try:
+            if now - os.path.getmtime(lease_path) < lease_timeout:
+                continue
+            folder = _release_lease(queue_dir, lease_path)
+        except (OSError, ValueError):
+            continue
+        if folder is None:
+            # The owner finished or another worker requeued it first
+            continue
+        print(f"Lease expired, moved {_shard_name(name)} to {folder}")
+        requeued += 1
+
+    return requeued
+
+
+def claim_shard(queue_dir):
+    """
+    Atomically lease one pending shard.
+
+    Only one worker can rename a given pending file, so the rename is the
+    lock. The lease name carries a token unique to this claim, so a worker
+    whose lease expired never touches the lease of the next owner. Shards
+    that are already done are dropped instead of leased.
+
+    Args:
+        queue_dir (str): Shared queue directory
+
+    Returns:
+        tuple: (lease_path, shard) or (None, None) if nothing is pending
+    """
+    for name in sorted(os.listdir(_queue_path(queue_dir, 'pending'))):
+        if not name.endswith('.json'):
+            continue
+
+        owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        lease_path = _queue_path(queue_dir, 'leased', _lease_name(name, owner))
+        try:
+            os.rename(_queue_path(queue_dir, 'pending', name), lease_path)
+            # rename keeps the publish time; start the lease clock now
+            os.utime(lease_path, None)
+        except OSError:
+            continue
+
+        if os.path.exists(_queue_path(queue_dir, 'done', name)):
+            _remove(lease_path)
+            continue
+
+        try:
+            return lease_path, _read_json(lease_path)
+        except (OSError, ValueError):
+            # Requeued from under us before we could read it
+            continue
+
+    return None, None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Touch a lease file periodically while its shard is being processed.
+    """
+
+    def __init__(self, lease_path, interval=HEARTBEAT_INTERVAL):
+        super().__init__(daemon=True)
+        self.lease_path = lease_path
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                os.utime(self.lease_path, None)
+            except OSError:
+                # Lease lost; the shard result is still written if we finish
+                return
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def process_shard(queue_dir, lease_path, shard, triage=False):
+    """
+    Extract the text of one shard and record the result.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        lease_path (str): Path of the leased shard file
+        shard (dict): Shard description
+        triage (bool): Use the converter's low-resolution triage pass
+
+    Returns:
+        bool: True if the shard was completed
+    """
+    name = f"{shard['shard_id']}.json"
+    heartbeat = _Heartbeat(lease_path)
+    heartbeat.start()
+
+    try:
+        with PDFToExcelConverter(shard['pdf_path'], triage=triage) as converter:
+            text_pages = converter.extract_text_from_pdf(shard['first_page'], shard['last_page'])
+    except Exception as e:
+        print(f"Error processing shard {shard['shard_id']}: {str(e)}")
+        text_pages = []
+    finally:
+        heartbeat.stop()
+
+    if len(text_pages) != shard['last_page'] - shard['first_page']:
+        # If the lease is gone it has expired and the shard belongs to
+        # someone else now
+        folder = _release_lease(queue_dir, lease_path, shard)
+        if folder is None:
+            print(f"Shard {shard['shard_id']} failed after its lease expired, leaving it to the new owner")
+        else:
+            print(f"Shard {shard['shard_id']} failed (attempt {shard['attempts']}), moved to {folder}")
+        return False
+
+    _write_json(_queue_path(queue_dir, 'done', name), {
+        'shard_id': shard['shard_id'],
+        'doc_id': shard['doc_id'],
+        'first_page': shard['first_page'],
+        'text_pages': text_pages,
+        'worker': f"{socket.gethostname()}:{os.getpid()}",
+    })
+    _remove(lease_path)
+    # Drop a stale copy if the lease expired and the shard was requeued
+    _remove(_queue_path(queue_dir, 'pending', name))
+    return True
+
+
+def run_worker(queue_dir, triage=False, exit_when_idle=True, lease_timeout=LEASE_TIMEOUT):
+    """
+    Claim and process shards until the queue is drained.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        triage (bool): Use the converter's low-resolution triage pass
+        exit_when_idle (bool): Stop once nothing is pending or leased
+        lease_timeout (float): Seconds without a heartbeat before a lease expires
+
+    Returns:
+        int: Number of shards completed by this worker
+    """
+    init_queue(queue_dir)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    completed = 0
+
+    while True:
+        requeue_expired(queue_dir, lease_timeout)
+        lease_path, shard = claim_shard(queue_dir)
+
+        if shard is None:
+            if exit_when_idle and not os.listdir(_queue_path(queue_dir, 'leased')):
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        print(f"[{worker_name}] Processing {shard['shard_id']}")
+        if process_shard(queue_dir, lease_path, shard, triage=triage):
+            completed += 1
+
+    print(f"[{worker_name}] Finished, {completed} shard(s) completed")
+    return completed
+
+
+def run_local_workers(queue_dir, processes, triage=False, exit_when_idle=True):
+    """
+    Start several worker processes on this machine and wait for them.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        processes (int): Number of worker processes
+        triage (bool): Use the converter's low-resolution triage pass
+        exit_when_idle (bool): Stop once nothing is pending or leased
+    """
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(queue_dir, triage, exit_when_idle))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def merge(queue_dir, store_path=None):
+    """
+    Write the workbook of every document whose shards are all done.
+
+    Documents with a shard in failed/ are reported as failed and skipped
+    rather than treated as still in progress.
+
+    Args:
+        queue_dir (str): Shared queue directory
+        store_path (str): SQLite staff store to index the rows in (optional)
+
+    Returns:
+        list: Output paths of the workbooks written
+    """
+    init_queue(queue_dir)
+    written = []
+
+    for name in sorted(os.listdir(_queue_path(queue_dir, 'documents'))):
+        if not name.endswith('.json'):
+            continue
+
+        manifest = _read_json(_queue_path(queue_dir, 'documents', name))
+        shard_paths = [_queue_path(queue_dir, 'done', f"{shard_id}.json") for shard_id in manifest['shards']]
+        failed = [shard_id for shard_id in manifest['shards']
+                  if os.path.exists(_queue_path(queue_dir, 'failed', f"{shard_id}.json"))]
+        if failed:
+            print(f"Failed: {os.path.basename(manifest['pdf_path'])}: {len(failed)} of {len(shard_paths)} "
+                  f"shard(s) ran out of attempts ({', '.join(failed)})")
+            continue
+
+        missing = [path for path in shard_paths if not os.path.exists(path)]
+        if missing:
+            print(f"Skipping {os.path.basename(manifest['pdf_path'])}: "
+                  f"{len(missing)} of {len(shard_paths)} shard(s) not done")
+            continue
+
+        results = sorted((_read_json(path) for path in shard_paths), key=lambda result: result['first_page'])
+        text_pages = [text for result in results for text in result['text_pages']]
+
+        print(f"Merging {os.path.basename(manifest['pdf_path'])} ({len(text_pages)} pages)...")
+        with PDFToExcelConverter(manifest['pdf_path'], manifest['output_path'], check_tesseract=False,
+                                 store_path=store_path) as converter:
+            converter.process_text_pages(text_pages)
+
+        os.replace(_queue_path(queue_dir, 'documents', name), _queue_path(queue_dir, 'merged', name))
+        for path in shard_paths:
+            _remove(path)
+        written.append(manifest['output_path'])
+
+    return written
+
+
+def main():
+    """
+    Command line entry point for the coordinator, workers and merge step.
+    """
+    parser = argparse.ArgumentParser(description="Sharded PDF to Excel conversion over a shared directory.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    publish_parser = subparsers.add_parser('publish', help="Publish PDFs as page-range shards")
+    publish_parser.add_argument('queue_dir')
+    publish_parser.add_argument('pdf_paths', nargs='+')
+    publish_parser.add_argument('--shard-size', type=int, default=10, help="Pages per shard")
+    publish_parser.add_argument('--output-dir', default=None, help="Directory for merged workbooks")
+
+    worker_parser = subparsers.add_parser('worker', help="Process shards until the queue is drained")
+    worker_parser.add_argument('queue_dir')
+    worker_parser.add_argument('--processes', type=int, default=1, help="Local worker processes to start")
+    worker_parser.add_argument('--triage', action='store_true', help="Use the low-resolution triage pass")
+    worker_parser.add_argument('--keep-running', action='store_true', help="Keep polling when the queue is empty")
+
+    merge_parser = subparsers.add_parser('merge', help="Write workbooks for completed documents")
+    merge_parser.add_argument('queue_dir')
+    merge_parser.add_argument('--store', default=None, metavar='DB', help="SQLite staff store to index rows in")
+
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        publish(args.queue_dir, args.pdf_paths, args.shard_size, args.output_dir)
+    elif args.command == 'worker':
+        if args.processes > 1:
+            run_local_workers(args.queue_dir, args.processes, args.triage, not args.keep_running)
+        else:
+            run_worker(args.queue_dir, args.triage, exit_when_idle=not args.keep_running)
+    elif args.command == 'merge':
+        written = merge(args.queue_dir, args.store)
+        print(f"{len(written)} workbook(s) written")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,258 @@ import re
 import os
 import sys
 import io
+import mmap
+import hashlib
+import argparse
+from collections import deque
+from html.parser import HTMLParser
+
+from ocr_scheduler import AdaptiveOCRScheduler, OCRTimeout
+from section_parser import SectionParser, load_schema
+from staff_store import StaffStore, records_from_rows, table_rows_from_rows
+from text_archive import TextArchive, file_digest, write_archive, ARCHIVE_EXTENSION
+
+class HOCRLineParser(HTMLParser):
+    """
+    Collect text lines and word boxes from Tesseract hOCR output.
+    """
+    LINE_CLASSES = ('ocr_line', 'ocr_caption', 'ocr_header', 'ocr_textfloat')
+    
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self._word = None
+        self._stack = []
+    
+    @staticmethod
+    def _bbox(title):
+        match = re.search(r'bbox (\d+) (\d+) (\d+) (\d+)', title or '')
+        return tuple(int(value) for value in match.groups()) if match else None
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        css_class = attrs.get('class', '')
+        self._stack.append(css_class)
+        
+        if css_class in self.LINE_CLASSES:
+            self.lines.append({'bbox': self._bbox(attrs.get('title')), 'words': []})
+        elif css_class == 'ocrx_word' and self.lines:
+            self._word = {'bbox': self._bbox(attrs.get('title')), 'text': ''}
+    
+    def handle_endtag(self, tag):
+        css_class = self._stack.pop() if self._stack else ''
+        if css_class == 'ocrx_word' and self._word is not None:
+            if self._word['text'].strip():
+                self.lines[-1]['words'].append(self._word)
+            self._word = None
+    
+    def handle_data(self, data):
+        if self._word is not None:
+            self._word['text'] += data
+
 
 class PDFToExcelConverter:
-    def __init__(self, pdf_path, output_path=None):
+    # 2x zoom for better OCR
+    OCR_ZOOM = 2
+    
+    # Triage settings: low-resolution render and the share of the page treated as its top strip
+    TRIAGE_ZOOM = 1
+    TRIAGE_STRIP = 0.25
+    BLANK_INK_RATIO = 0.002
+    
+    # Pages kept by triage, in the order they get full-resolution OCR
+    TRIAGE_PRIORITY = {'registry': 0, 'tabular': 1}
+    
+    # Suffix of the searchable copy written next to the source PDF
+    SEARCHABLE_SUFFIX = '_searchable.pdf'
+    
+    # Document info key holding the SHA-256 of the PDF a searchable copy was made from
+    SEARCHABLE_SOURCE_KEY = 'PDFToExcelSource'
+    
+    # Files at least this large are memory-mapped instead of opened by path
+    MMAP_THRESHOLD = 64 * 1024 * 1024
+    
+    def __init__(self, pdf_path, output_path=None, triage=False, searchable_path=None,
+                 check_tesseract=True, workers=None, page_timeout=120, rss_limit_mb=None, schema_path=None,
+                 store_path=None, text_archive_path=None, archive_words=False, source_name=None):
         """
         Initialize the PDF to Excel converter.
         
         Args:
-            pdf_path (str): Path to the PDF file
-            output_path (str): Path for the output Excel file (optional)
+            pdf_path (str | bytes | file object): Path to the PDF file, '-' for
+                stdin, the PDF contents as bytes, or a binary file object
+            output_path (str | file object): Path or writable binary buffer
+                for the output Excel file (optional; in-memory input without
+                a name defaults to an io.BytesIO buffer)
+            triage (bool): Classify scanned pages at low resolution first and
+                only run full OCR on registry and tabular pages
+            searchable_path (str): Save a copy of the PDF with the OCR text as
+                an invisible text layer ('' derives the name from pdf_path)
+            check_tesseract (bool): Locate Tesseract up front; disable when
+                only parsing text that was extracted elsewhere
+            workers (int): Maximum parallel OCR jobs; enables the adaptive
+                scheduler with per-page timeouts (optional)
+            page_timeout (float): Seconds allowed per OCR attempt when
+                workers is set
+            rss_limit_mb (float): With workers set, halve OCR concurrency
+                while this process and its Tesseract children use more
+                resident memory than this (optional)
+            schema_path (str): JSON file declaring the sections to parse
+                (defaults to registry_schema.json)
+            store_path (str): SQLite staff store to upsert extracted rows
+                into (optional)
+            text_archive_path (str): Write the full page text to a compressed
+                archive that the Raw_Text sheet links to ('' derives the name
+                from output_path)
+            archive_words (bool): Also store word boxes in the archive
+            source_name (str): Name recorded for the source in the summary
+                and the staff store; in-memory input without one is stored
+                under a hash of its contents (optional)
+        """
+        self._pdf_buffer = None
+        self._pdf_map = None
+        self._pdf_view = None
+        self.is_path_source = False
+        self.pdf_path = self._load_source(pdf_path)
+        self.source_name = source_name
+        
+        if output_path is None:
+            if self.is_path_source:
+                output_path = os.path.splitext(self.pdf_path)[0] + '.xlsx'
+            else:
+                output_path = io.BytesIO()
+        self.output_path = output_path
+        
+        self.triage = triage
+        if searchable_path == '':
+            if not self.is_path_source:
+                raise ValueError("searchable_path must be given for in-memory input")
+            searchable_path = os.path.splitext(self.pdf_path)[0] + self.SEARCHABLE_SUFFIX
+        self.searchable_path = searchable_path
+        self.page_classes = {}
+        self.workers = workers
+        self.page_timeout = page_timeout
+        self.rss_limit_mb = rss_limit_mb
+        self.section_parser = SectionParser(load_schema(schema_path), self._looks_like_staff_name)
+        self.store_path = store_path
+        if text_archive_path == '':
+            if not isinstance(self.output_path, (str, os.PathLike)):
+                raise ValueError("text_archive_path must be given when writing to a buffer")
+            text_archive_path = os.path.splitext(self.output_path)[0] + '_text' + ARCHIVE_EXTENSION
+        self.text_archive_path = text_archive_path
+        self.archive_words = archive_words and bool(text_archive_path)
+        self.page_words = {}
+        self._archive_ready = False
+        self._archive_is_source = False
+        self._replay_digest = None
+        self.trace = None
+        
+        # Auto-detect Tesseract path on Windows
+        if check_tesseract:
+            self._setup_tesseract_path()
+    
+    def _load_source(self, source):
+        """
+        Accept a path, stdin, bytes or a file object as the PDF source.
+        
+        Large files and file objects backed by a real file are memory-mapped
+        read-only, so the pages are read straight from the OS page cache and
+        processes forked from this one share the mapping.
+        
+        Args:
+            source (str | bytes | file object): PDF source
+        
+        Returns:
+            str: Name used for the source in messages and the summary
         """
-        self.pdf_path = pdf_path
-        self.output_path = output_path or pdf_path.replace('.pdf', '.xlsx')
-          # Auto-detect Tesseract path on Windows
-        self._setup_tesseract_path()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._pdf_buffer = bytes(source) if isinstance(source, bytearray) else source
+            return '<memory>'
+        
+        if isinstance(source, str) and source == '-':
+            self._read_stream(sys.stdin.buffer)
+            return '<stdin>'
+        
+        if hasattr(source, 'read'):
+            self._read_stream(source)
+            name = getattr(source, 'name', None)
+            return name if isinstance(name, str) else '<memory>'
+        
+        path = os.fspath(source)
+        self.is_path_source = True
+        if os.path.isfile(path) and os.path.getsize(path) >= self.MMAP_THRESHOLD:
+            with open(path, 'rb') as f:
+                self._map_file(f)
+        return path
+    
+    def _read_stream(self, stream):
+        """
+        Memory-map a file-backed stream, or read it from its current position.
+        """
+        # A mapping covers the whole file, so only map streams positioned at
+        # its start; a PDF embedded further into a file is read instead
+        try:
+            at_start = stream.tell() == 0
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            at_start = False
+        
+        if at_start:
+            try:
+                self._map_file(stream)
+                return
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                pass
+        
+        # Pipes and in-memory buffers cannot be mapped
+        if isinstance(stream, io.BytesIO):
+            self._pdf_view = stream.getbuffer()[stream.tell():]
+            self._pdf_buffer = self._pdf_view
+        else:
+            self._pdf_buffer = stream.read()
+    
+    def _map_file(self, f):
+        self._pdf_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pdf_view = memoryview(self._pdf_map)
+        self._pdf_buffer = self._pdf_view
+    
+    def close(self):
+        """
+        Release the memory mapping or buffer view of the PDF source.
+        
+        Call when the converter is done (or use it as a context manager);
+        long-running processes otherwise keep one mapping per converter.
+        """
+        self._pdf_buffer = None
+        if self._pdf_view is not None:
+            self._pdf_view.release()
+            self._pdf_view = None
+        if self._pdf_map is not None:
+            self._pdf_map.close()
+            self._pdf_map = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def open_document(self):
+        """
+        Open the PDF source with PyMuPDF.
+        
+        In-memory and memory-mapped sources are opened from the buffer
+        without copying it.
+        
+        Returns:
+            fitz.Document: Open document
+        """
+        if self._pdf_buffer is None:
+            return fitz.open(self.pdf_path)
+        try:
+            return fitz.open(stream=self._pdf_buffer, filetype='pdf')
+        except TypeError:
+            # Older PyMuPDF releases only accept bytes
+            return fitz.open(stream=bytes(self._pdf_buffer), filetype='pdf')
     
     def _setup_tesseract_path(self):
         """
@@ -66,21 +304,41 @@ class PDFToExcelConverter:
         print("3. Or install using: choco install tesseract")
         raise FileNotFoundError("Tesseract OCR not found. Please install it first.")
     
-    def extract_text_from_pdf(self):
+    def extract_text_from_pdf(self, first_page=0, last_page=None):
         """
         Extract text from PDF using PyMuPDF and OCR.
         
+        Args:
+            first_page (int): Zero-based index of the first page to extract
+            last_page (int): Zero-based index after the last page (optional)
+        
         Returns:
-            list: List of text content from each page
+            list: List of text content from each extracted page
         """
         try:
             # Open PDF with PyMuPDF
             print("Opening PDF...")
-            doc = fitz.open(self.pdf_path)
+            doc = None
+            source_digest = self._source_digest() if self.searchable_path else None
+            reuse_searchable = False
+            if self.searchable_path and os.path.exists(self.searchable_path):
+                doc = fitz.open(self.searchable_path)
+                reuse_searchable = self._searchable_source(doc) == source_digest
+                if reuse_searchable:
+                    # A previous run already stored the OCR text layer
+                    print(f"Using searchable copy: {self.searchable_path}")
+                else:
+                    print(f"Searchable copy {self.searchable_path} was made from a different PDF, running OCR again")
+                    doc.close()
+                    doc = None
+            if doc is None:
+                doc = self.open_document()
             
-            extracted_text = []
+            last_page = len(doc) if last_page is None else min(last_page, len(doc))
+            extracted_text = {page_num: '' for page_num in range(first_page, last_page)}
+            ocr_pages = []
             
-            for page_num in range(len(doc)):
+            for page_num in range(first_page, last_page):
                 print(f"Processing page {page_num + 1}/{len(doc)}...")
                 page = doc.load_page(page_num)
                 
@@ -89,30 +347,335 @@ class PDFToExcelConverter:
                 
                 if text.strip():
                     print(f"Found text directly on page {page_num + 1}")
-                    extracted_text.append(text)
+                    extracted_text[page_num] = text
+                    if self.archive_words:
+                        self.page_words[page_num] = [
+                            [round(value, 2) for value in word[:4]] + [word[4]] for word in page.get_text('words')
+                        ]
                 else:
+                    ocr_pages.append(page_num)
+            
+            # Decide which scanned pages are worth a full-resolution OCR pass
+            if self.triage and ocr_pages:
+                ocr_pages = self.triage_pages(doc, ocr_pages)
+            
+            if self.workers:
+                if ocr_pages:
+                    self._ocr_pages_scheduled(doc, ocr_pages, extracted_text)
+            else:
+                for page_num in ocr_pages:
                     # If no text found, use OCR on the page image
                     print(f"No direct text found, using OCR on page {page_num + 1}")
+                    page = doc.load_page(page_num)
+                    img = self._render_page_image(page, self.OCR_ZOOM)
                     
-                    # Convert page to image
-                    mat = fitz.Matrix(2, 2)  # 2x zoom for better OCR
-                    pix = page.get_pixmap(matrix=mat)
-                    img_data = pix.tobytes("png")
-                    
-                    # Convert to PIL Image
-                    img = Image.open(io.BytesIO(img_data))
-                    
-                    # Perform OCR on the image
-                    ocr_text = pytesseract.image_to_string(img, lang='eng')
-                    extracted_text.append(ocr_text)
+                    if self.searchable_path or self.archive_words:
+                        text, lines = self._ocr_image_with_layout(img)
+                        self._use_layout(page, lines, self.OCR_ZOOM)
+                    else:
+                        text = self._ocr_image(img)
+                    extracted_text[page_num] = text
+            
+            if self.searchable_path and ocr_pages:
+                if reuse_searchable:
+                    doc.saveIncr()
+                else:
+                    self._set_searchable_source(doc, source_digest)
+                    doc.save(self.searchable_path, garbage=3, deflate=True)
+                print(f"Searchable PDF saved: {self.searchable_path}")
             
             doc.close()
-            return extracted_text
+            return [extracted_text[page_num] for page_num in range(first_page, last_page)]
             
         except Exception as e:
             print(f"Error extracting text from PDF: {str(e)}")
             return []
     
+    def _source_digest(self):
+        """
+        SHA-256 of the PDF source, used to tell whether a searchable copy or text archive is current.
+        
+        Returns:
+            str: Hex digest
+        """
+        if self._pdf_buffer is None:
+            return file_digest(self.pdf_path)
+        return hashlib.sha256(self._pdf_buffer).hexdigest()
+    
+    def _searchable_source(self, doc):
+        """
+        Return the source digest stored in a searchable copy, or None.
+        """
+        kind, value = doc.xref_get_key(-1, 'Info')
+        if kind != 'xref':
+            return None
+        kind, value = doc.xref_get_key(int(value.split()[0]), self.SEARCHABLE_SOURCE_KEY)
+        return value if kind == 'string' else None
+    
+    def _set_searchable_source(self, doc, source_digest):
+        """
+        Record the source digest in the document info of a searchable copy.
+        """
+        if doc.xref_get_key(-1, 'Info')[0] != 'xref':
+            # Writing the metadata creates the document info dictionary
+            doc.set_metadata(doc.metadata)
+        info_xref = int(doc.xref_get_key(-1, 'Info')[1].split()[0])
+        doc.xref_set_key(info_xref, self.SEARCHABLE_SOURCE_KEY, fitz.get_pdf_str(source_digest))
+    
+    def _ocr_pages_scheduled(self, doc, page_numbers, extracted_text):
+        """
+        OCR scanned pages in parallel with the adaptive scheduler.
+        
+        Pages that time out are retried at lower resolution with a faster
+        Tesseract profile; pages that never finish are left empty.
+        
+        Args:
+            doc (fitz.Document): Open PDF document
+            page_numbers (list): Zero-based page numbers to OCR, in priority order
+            extracted_text (dict): Page number -> text, updated in place
+        """
+        print(f"OCR on {len(page_numbers)} page(s) with up to {self.workers} workers...")
+        jobs = []
+        for page_num in page_numbers:
+            rect = doc.load_page(page_num).rect
+            # Keep the triage order, large pages first within each class
+            priority = self.TRIAGE_PRIORITY.get(self.page_classes.get(page_num), 0)
+            jobs.append({'page_num': page_num, 'area': rect.width * rect.height, 'priority': priority})
+        
+        def render(page_num, zoom):
+            return self._render_page_image(doc.load_page(page_num), zoom)
+        
+        if self.searchable_path or self.archive_words:
+            def ocr(img, config, timeout):
+                return self._ocr_image_with_layout(img, config=config, timeout=timeout)
+        else:
+            def ocr(img, config, timeout):
+                return self._ocr_image(img, config=config, timeout=timeout)
+        
+        scheduler = AdaptiveOCRScheduler(max_workers=self.workers, page_timeout=self.page_timeout,
+                                         rss_limit_mb=self.rss_limit_mb)
+        results = scheduler.run(jobs, render, ocr)
+        
+        for page_num, (result, zoom) in results.items():
+            if result is None:
+                continue
+            if self.searchable_path or self.archive_words:
+                text, lines = result
+                self._use_layout(doc.load_page(page_num), lines, zoom)
+            else:
+                text = result
+            extracted_text[page_num] = text
+    
+    def triage_pages(self, doc, page_numbers):
+        """
+        Classify scanned pages with a cheap low-resolution pass.
+        
+        Each page is rendered as a grayscale thumbnail to spot blank pages.
+        The remaining pages are OCR'd once from the thumbnail: lines in the
+        top strip are checked for section titles first, then the whole page
+        for sections and tables lower down. Pages are classified as
+        'registry', 'tabular', 'blank' or 'irrelevant'.
+        
+        Args:
+            doc (fitz.Document): Open PDF document
+            page_numbers (list): Zero-based page numbers to classify
+        
+        Returns:
+            list: Page numbers that need full OCR, in priority order
+        """
+        print(f"Triaging {len(page_numbers)} scanned page(s) at low resolution...")
+        self.page_classes = {}
+        previous_class = None
+        
+        for page_num in page_numbers:
+            page = doc.load_page(page_num)
+            page_class = self._classify_page(page, previous_class)
+            self.page_classes[page_num] = page_class
+            print(f"Page {page_num + 1}: {page_class}")
+            previous_class = page_class
+        
+        selected = [
+            page_num for page_num in page_numbers
+            if self.page_classes[page_num] in self.TRIAGE_PRIORITY
+        ]
+        selected.sort(key=lambda page_num: self.TRIAGE_PRIORITY[self.page_classes[page_num]])
+        
+        skipped = len(page_numbers) - len(selected)
+        print(f"Full OCR scheduled for {len(selected)} page(s), skipped {skipped}")
+        return selected
+    
+    def _classify_page(self, page, previous_class=None):
+        """
+        Classify a single scanned page from a low-resolution render.
+        
+        Args:
+            page (fitz.Page): Page to classify
+            previous_class (str): Class of the preceding page (optional)
+        
+        Returns:
+            str: One of 'registry', 'tabular', 'blank' or 'irrelevant'
+        """
+        thumbnail = self._render_page_image(page, self.TRIAGE_ZOOM, grayscale=True)
+        histogram = thumbnail.histogram()
+        dark_pixels = sum(histogram[:128])
+        if dark_pixels / max(1, thumbnail.width * thumbnail.height) < self.BLANK_INK_RATIO:
+            return 'blank'
+        
+        # One OCR run over the whole thumbnail; hOCR line positions tell
+        # which lines fall in the top strip, where section titles live
+        text, layout_lines = self._ocr_image_with_layout(thumbnail)
+        strip_bottom = thumbnail.height * self.TRIAGE_STRIP
+        strip_lines = [
+            ' '.join(word['text'] for word in line['words']).strip()
+            for line in layout_lines if line['bbox'][3] <= strip_bottom
+        ]
+        strip_lines = [line for line in strip_lines if line]
+        
+        if self.section_parser.mentions_section(strip_lines):
+            return 'registry'
+        
+        # A roster that runs over a page break continues with headers or
+        # credentialed names
+        sections = self.section_parser.sections
+        if previous_class == 'registry' and any(
+                section.continues(line) for section in sections for line in strip_lines):
+            return 'registry'
+        
+        # Sections and tables can start further down the page
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        
+        if self.section_parser.mentions_section(lines):
+            return 'registry'
+        
+        table_lines = [
+            line for line in lines
+            if re.search(r'\d', line) and len(re.split(r'\s{2,}|\t|[|;,]', line)) >= 2
+        ]
+        if len(table_lines) >= 2:
+            return 'tabular'
+        
+        return 'irrelevant'
+    
+    def _render_page_image(self, page, zoom, clip=None, grayscale=False):
+        """
+        Render a page (or part of it) to a PIL image.
+        
+        Args:
+            page (fitz.Page): Page to render
+            zoom (float): Zoom factor relative to 72 DPI
+            clip (fitz.Rect): Area of the page to render (optional)
+            grayscale (bool): Render a single-channel image
+        
+        Returns:
+            PIL.Image: Rendered page image
+        """
+        mat = fitz.Matrix(zoom, zoom)
+        colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+        pix = page.get_pixmap(matrix=mat, clip=clip, colorspace=colorspace)
+        img_data = pix.tobytes("png")
+        
+        # Convert to PIL Image
+        return Image.open(io.BytesIO(img_data))
+    
+    def _ocr_image(self, img, config='', timeout=0):
+        """
+        Perform OCR on a page image.
+        
+        Args:
+            img (PIL.Image): Image to read
+            config (str): Extra Tesseract options
+            timeout (float): Seconds before Tesseract is killed (0 = no limit)
+        
+        Returns:
+            str: Recognized text
+        """
+        try:
+            return pytesseract.image_to_string(img, lang='eng', config=config, timeout=timeout)
+        except RuntimeError as e:
+            if 'timeout' in str(e).lower():
+                raise OCRTimeout(str(e))
+            raise
+    
+    def _ocr_image_with_layout(self, img, config='', timeout=0):
+        """
+        Perform OCR on a page image, keeping line and word positions.
+        
+        Text and hOCR come from a single Tesseract run, so the text is
+        identical to what _ocr_image returns.
+        
+        Args:
+            img (PIL.Image): Image to read
+            config (str): Extra Tesseract options
+            timeout (float): Seconds before Tesseract is killed (0 = no limit)
+        
+        Returns:
+            tuple: (text, lines) where each line is a dict with a pixel 'bbox'
+                and a list of 'words' (each with 'bbox' and 'text')
+        """
+        # Same call as pytesseract.run_and_get_multiple_output, which does not
+        # take extra options
+        config = f"{config} -c tessedit_create_hocr=1".strip()
+        try:
+            with pytesseract.pytesseract.save(img) as (output_base, input_filename):
+                pytesseract.pytesseract.run_tesseract(input_filename, output_base, 'txt hocr', 'eng',
+                                                      config=config, timeout=timeout)
+                with open(f"{output_base}.txt", 'r', encoding='utf-8') as f:
+                    text = f.read()
+                with open(f"{output_base}.hocr", 'r', encoding='utf-8') as f:
+                    hocr = f.read()
+        except RuntimeError as e:
+            if 'timeout' in str(e).lower():
+                raise OCRTimeout(str(e))
+            raise
+        parser = HOCRLineParser()
+        parser.feed(hocr)
+        return text, [line for line in parser.lines if line['words'] and line['bbox']]
+    
+    def _use_layout(self, page, lines, zoom):
+        """
+        Keep the OCR layout of a page for the searchable copy and the archive.
+        
+        Args:
+            page (fitz.Page): Page that was OCR'd
+            lines (list): Lines from _ocr_image_with_layout
+            zoom (float): Zoom factor the OCR image was rendered at
+        """
+        if self.searchable_path:
+            self._add_text_layer(page, lines, zoom)
+        
+        if self.archive_words:
+            words = []
+            for line in lines:
+                for word in line['words']:
+                    # Same (unrotated) page coordinates as page.get_text('words')
+                    rect = fitz.Rect([value / zoom for value in word['bbox']]) * page.derotation_matrix
+                    words.append([round(rect.x0, 2), round(rect.y0, 2), round(rect.x1, 2), round(rect.y1, 2),
+                                  word['text']])
+            self.page_words[page.number] = words
+    
+    def _add_text_layer(self, page, lines, zoom):
+        """
+        Write OCR lines onto a page as invisible, searchable text.
+        
+        Args:
+            page (fitz.Page): Page to annotate
+            lines (list): Lines from _ocr_image_with_layout
+            zoom (float): Zoom factor the OCR image was rendered at
+        """
+        for line in lines:
+            text = ' '.join(word['text'] for word in line['words'])
+            x0, y0, x1, y1 = (value / zoom for value in line['bbox'])
+            fontsize = max(1, y1 - y0)
+            
+            # Image coordinates follow the displayed (rotated) page
+            point = fitz.Point(x0, y1) * page.derotation_matrix
+            width = fitz.get_text_length(text, fontname='helv', fontsize=fontsize)
+            scale = (x1 - x0) / width if width else 1
+            
+            page.insert_text(point, text, fontsize=fontsize, fontname='helv',
+                             render_mode=3, rotate=page.rotation,
+                             morph=(point, fitz.Matrix(scale, 1)))
+    
     def parse_text_to_structured_data(self, text_pages):
         """
         Parse extracted text into structured data for Registry Staff format.
@@ -125,6 +688,9 @@ class PDFToExcelConverter:
         """
         all_data = []
         
+        # Sections may continue across pages, but not across documents
+        self.section_parser.reset()
+        
         for page_num, text in enumerate(text_pages):
             if not text.strip():
                 continue
@@ -142,7 +708,10 @@ class PDFToExcelConverter:
     
     def _parse_registry_staff(self, text, page_num):
         """
-        Parse registry staff data with specific headers like TheraEX, Intuitive, etc.
+        Parse registry staff data with the headers declared in the section schema.
+        
+        The open section and header carry over from the previous page, so
+        call pages in order after resetting self.section_parser.
         
         Args:
             text (str): Text content from the page
@@ -151,62 +720,7 @@ class PDFToExcelConverter:
         Returns:
             list: List of dictionaries with registry staff data
         """
-        # Define expected headers
-        headers = ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']
-        
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Find registry staff section
-        registry_start = -1
-        for i, line in enumerate(lines):
-            if 'Registry Staff' in line and 'not in Qgenda' in line:
-                registry_start = i
-                break
-        
-        if registry_start == -1:
-            return []
-        
-        # Initialize data structure
-        staff_data = {header: [] for header in headers}
-        current_header = None
-        
-        # Process lines after the registry staff header
-        for i in range(registry_start + 1, len(lines)):
-            line = lines[i]
-            
-            # Check if this line is a header (ends with colon)
-            if line.endswith(':'):
-                header_name = line.rstrip(':')
-                if header_name in headers:
-                    current_header = header_name
-                    continue
-            
-            # Check if this is a separator line (underscores)
-            if re.match(r'^_+$', line):
-                continue
-            
-            # Skip empty or very short lines
-            if len(line) < 3:
-                continue
-            
-            # If we have a current header and this looks like a name
-            if current_header and self._looks_like_staff_name(line):
-                staff_data[current_header].append(line)
-        
-        # Convert to list of dictionaries for Excel
-        result = []
-        max_length = max(len(names) for names in staff_data.values()) if any(staff_data.values()) else 0
-        
-        for row_idx in range(max_length):
-            row_data = {'Row_Number': row_idx + 1, 'Page': page_num + 1}
-            for header in headers:
-                if row_idx < len(staff_data[header]):
-                    row_data[header] = staff_data[header][row_idx]
-                else:
-                    row_data[header] = ''
-            result.append(row_data)
-        
-        return result
+        return self.section_parser.parse_page(text, page_num)
     
     def _looks_like_staff_name(self, line):
         """
@@ -304,6 +818,9 @@ class PDFToExcelConverter:
                             row_data[f'Column_{i+1}'] = part
                         
                         all_tables.append(row_data)
+                        
+                        if self.trace is not None:
+                            self.trace.append((page_num + 1, line, 'table', None, None))
         
         return all_tables
     
@@ -327,7 +844,7 @@ class PDFToExcelConverter:
                 df.to_excel(writer, sheet_name='Registry_Staff', index=False)
                 
                 # Create a summary sheet
-                registry_headers = ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']
+                registry_headers = self.section_parser.header_columns
                 has_registry_data = any(col in df.columns for col in registry_headers)
                 
                 if has_registry_data:
@@ -337,7 +854,7 @@ class PDFToExcelConverter:
                         'Value': [
                             len(df),
                             df['Page'].nunique() if 'Page' in df.columns else 1,
-                            os.path.basename(self.pdf_path)
+                            os.path.basename(self.source_name or self.pdf_path)
                         ] + [
                             len(df[df[header].notna() & (df[header] != '')]) if header in df.columns else 0
                             for header in registry_headers
@@ -351,14 +868,24 @@ class PDFToExcelConverter:
                             len(df),
                             df['Page'].nunique() if 'Page' in df.columns else 1,
                             len([col for col in df.columns if col.startswith('Column_')]),
-                            os.path.basename(self.pdf_path)
+                            os.path.basename(self.source_name or self.pdf_path)
                         ]
                     }
                 summary_df = pd.DataFrame(summary_data)
                 summary_df.to_excel(writer, sheet_name='Summary', index=False)
                 
                 # Create a raw text sheet for reference
-                if hasattr(self, '_raw_text'):
+                if hasattr(self, '_raw_text') and self.text_archive_path and self._archive_ready:
+                    # The full text lives in the archive; only link to it here
+                    archive_name = self._archive_link()
+                    raw_df = pd.DataFrame([
+                        {'Page': i + 1, 'Characters': len(text), 'Archive': archive_name}
+                        for i, text in enumerate(self._raw_text)
+                    ])
+                    raw_df.to_excel(writer, sheet_name='Raw_Text', index=False)
+                    for row in writer.sheets['Raw_Text'].iter_rows(min_row=2, min_col=3, max_col=3):
+                        row[0].hyperlink = archive_name
+                elif hasattr(self, '_raw_text'):
                     raw_text_data = []
                     for i, text in enumerate(self._raw_text):
                         raw_text_data.append({
@@ -368,7 +895,8 @@ class PDFToExcelConverter:
                     raw_df = pd.DataFrame(raw_text_data)
                     raw_df.to_excel(writer, sheet_name='Raw_Text', index=False)
             
-            print(f"Excel file created successfully: {self.output_path}")
+            output_name = self.output_path if isinstance(self.output_path, (str, os.PathLike)) else 'buffer'
+            print(f"Excel file created successfully: {output_name}")
             print(f"Total rows extracted: {len(df)}")
             
             # Print column summary
@@ -383,10 +911,10 @@ class PDFToExcelConverter:
         """
         Main conversion method.
         """
-        print(f"Starting conversion of {self.pdf_path}...")
+        print(f"Starting conversion of {self.source_name or self.pdf_path}...")
         
         # Check if PDF file exists
-        if not os.path.exists(self.pdf_path):
+        if self._pdf_buffer is None and not os.path.exists(self.pdf_path):
             print(f"Error: PDF file not found at {self.pdf_path}")
             return
         
@@ -397,6 +925,104 @@ class PDFToExcelConverter:
             print("No text could be extracted from the PDF.")
             return
         
+        self.process_text_pages(text_pages)
+        
+        print("Conversion completed!")
+    
+    def replay(self, text_pages=None, archive_path=None, trace_size=0):
+        """
+        Rerun parsing and write the outputs from stored page text, without OCR.
+        
+        The text goes through process_text_pages exactly like in a full run,
+        so the workbook (and staff store, if set) come out the same.
+        
+        Args:
+            text_pages (list): Page text from an earlier run (optional)
+            archive_path (str): Text archive to read the pages from when
+                text_pages is not given
+            trace_size (int): Keep the last N per-line parse decisions in a
+                ring buffer (0 disables tracing)
+        
+        Returns:
+            list: Trace entries (page, line, decision, section, header)
+        """
+        text_pages, self._replay_digest, page_words = self._load_replay_pages(text_pages, archive_path)
+        if page_words:
+            # Keep the stored word boxes when the text goes to another archive
+            self.page_words = page_words
+        
+        # Link to the archive the text came from, but do not rewrite it
+        self._archive_is_source = bool(archive_path and self.text_archive_path) and \
+            os.path.abspath(archive_path) == os.path.abspath(self.text_archive_path)
+        
+        self._start_trace(trace_size)
+        try:
+            self.process_text_pages(text_pages)
+        finally:
+            self._archive_is_source = False
+            self._replay_digest = None
+        return self._finish_trace()
+    
+    def parse_replay(self, text_pages=None, archive_path=None, trace_size=0):
+        """
+        Parse stored page text like replay, without writing any output.
+        
+        Args:
+            text_pages (list): Page text from an earlier run (optional)
+            archive_path (str): Text archive to read the pages from when
+                text_pages is not given
+            trace_size (int): Keep the last N per-line parse decisions in a
+                ring buffer (0 disables tracing)
+        
+        Returns:
+            tuple: (rows from parse_text_to_structured_data, trace entries)
+        """
+        text_pages, _, _ = self._load_replay_pages(text_pages, archive_path)
+        
+        self._start_trace(trace_size)
+        try:
+            rows = self.parse_text_to_structured_data(text_pages)
+        finally:
+            trace = self._finish_trace()
+        return rows, trace
+    
+    def _load_replay_pages(self, text_pages, archive_path):
+        """
+        Return the page text to replay, reading the archive if needed.
+        
+        Returns:
+            tuple: (text_pages, SHA-256 of the PDF the archive was made from
+                or None if unknown, page index -> stored word boxes)
+        """
+        if text_pages is None:
+            with TextArchive(archive_path) as archive:
+                text_pages = archive.text_pages()
+                source_digest = archive.source_digest
+                page_words = {}
+                for page_num in range(len(archive)):
+                    words = archive.page_words(page_num)
+                    if words:
+                        page_words[page_num] = words
+            print(f"Replaying {len(text_pages)} page(s) from {archive_path}")
+            return text_pages, source_digest, page_words
+        return text_pages, None, {}
+    
+    def _start_trace(self, trace_size):
+        self.trace = deque(maxlen=trace_size) if trace_size else None
+        self.section_parser.trace = self.trace
+    
+    def _finish_trace(self):
+        self.section_parser.trace = None
+        trace, self.trace = list(self.trace or []), None
+        return trace
+    
+    def process_text_pages(self, text_pages):
+        """
+        Parse extracted page text and write the Excel file.
+        
+        Args:
+            text_pages (list): List of text content from each page
+        """
         # Store raw text for reference
         self._raw_text = text_pages
         
@@ -419,31 +1045,166 @@ class PDFToExcelConverter:
                     'Content': text
                 })
         
+        # Without an archive the Raw_Text sheet keeps the (truncated) text
+        if self._archive_is_source:
+            self._archive_ready = True
+        else:
+            self._archive_ready = bool(self.text_archive_path) and self.write_text_archive(text_pages)
+        
         # Create Excel file
         print("Creating Excel file...")
         self.create_excel_file(final_data)
         
-        print("Conversion completed!")
+        if self.store_path:
+            self.store_rows(structured_data + table_data)
+    
+    def write_text_archive(self, text_pages):
+        """
+        Write the complete page text (and word boxes, if kept) to the archive.
+        
+        Args:
+            text_pages (list): List of text content from each page
+        
+        Returns:
+            bool: True if the archive was written
+        """
+        try:
+            # A replayed archive still describes the PDF the text came from
+            source_digest = self._replay_digest
+            if source_digest is None and (self._pdf_buffer is not None or os.path.exists(self.pdf_path)):
+                source_digest = self._source_digest()
+            size = write_archive(self.text_archive_path, text_pages, self.page_words,
+                                 source_digest=source_digest)
+            print(f"Text archive written: {self.text_archive_path} ({size} bytes)")
+            return True
+        except Exception as e:
+            print(f"Error writing text archive: {str(e)}")
+            return False
+    
+    def _store_key(self):
+        """
+        Key that identifies the source document in the staff store.
+        
+        Returns:
+            str: source_name if given, the absolute path for files, or a
+                content hash for unnamed in-memory input, so separate
+                conversions never replace each other's records
+        """
+        if self.source_name:
+            return self.source_name
+        if self.is_path_source:
+            return os.path.abspath(self.pdf_path)
+        if self.pdf_path in ('<memory>', '<stdin>'):
+            return f"sha256:{self._source_digest()}"
+        return self.pdf_path
+    
+    def _archive_link(self):
+        """
+        Hyperlink target of the text archive, relative to the workbook.
+        
+        Returns:
+            str: Path of the archive as seen from the workbook's directory
+        """
+        archive_path = os.path.abspath(self.text_archive_path)
+        if not isinstance(self.output_path, (str, os.PathLike)):
+            return archive_path
+        try:
+            return os.path.relpath(archive_path, os.path.dirname(os.path.abspath(self.output_path)))
+        except ValueError:
+            # Different drives on Windows
+            return archive_path
+    
+    def store_rows(self, rows):
+        """
+        Upsert registry and table rows into the staff store.
+        
+        Args:
+            rows (list): Rows from parse_text_to_structured_data and
+                detect_table_structure
+        """
+        try:
+            records = records_from_rows(rows, self.section_parser.header_columns)
+            table_rows = table_rows_from_rows(rows)
+            with StaffStore(self.store_path) as store:
+                count = store.upsert_document(self._store_key(), records, table_rows)
+            print(f"Stored {count} record(s) and {len(table_rows)} table row(s) in {self.store_path}")
+        except Exception as e:
+            print(f"Error updating staff store: {str(e)}")
+
+def format_trace(trace):
+    """
+    Format replay trace entries as aligned text lines.
+    
+    Args:
+        trace (list): Entries from PDFToExcelConverter.replay
+    
+    Returns:
+        list: One formatted line per entry
+    """
+    lines = []
+    for page, line, decision, section, header in trace:
+        context = '/'.join(part for part in (section, header) if part)
+        lines.append(f"p{page:<4} {decision:<9} {context:<30} {line!r}")
+    return lines
 
 def main():
     """
     Main function to run the PDF to Excel converter.
     """
-    # Get PDF file path from command line argument or use default
-    if len(sys.argv) > 1:
-        pdf_path = sys.argv[1]
-    else:
-        # Use the PDF file in the current directory
-        pdf_path = "Document250616132824.pdf"
+    parser = argparse.ArgumentParser(description="Convert scanned PDF files to Excel using OCR.")
+    # Use the PDF file in the current directory by default
+    parser.add_argument('pdf_path', nargs='?', default="Document250616132824.pdf",
+                        help="PDF file to convert ('-' reads the PDF from stdin)")
+    parser.add_argument('output_path', nargs='?', default=None,
+                        help="Output Excel file (optional)")
+    parser.add_argument('--triage', action='store_true',
+                        help="Skip full OCR on pages that look blank or irrelevant at low resolution")
+    parser.add_argument('--searchable-pdf', nargs='?', const='', default=None, metavar='PATH',
+                        help="Save OCR text as an invisible text layer so later runs skip OCR "
+                             "(default: <input>_searchable.pdf)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Run OCR on up to this many pages in parallel, adapting to CPU and memory load")
+    parser.add_argument('--page-timeout', type=float, default=120,
+                        help="Seconds per OCR attempt before a page is retried with a faster profile")
+    parser.add_argument('--max-rss-mb', type=float, default=None, metavar='MB',
+                        help="With --workers, cut OCR concurrency while this process and its Tesseract "
+                             "children use more memory than this (needs psutil)")
+    parser.add_argument('--schema', default=None, metavar='PATH',
+                        help="JSON file declaring section anchors and headers (default: registry_schema.json)")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="SQLite file to index extracted staff records in (see staff_store.py)")
+    parser.add_argument('--text-archive', nargs='?', const='', default=None, metavar='PATH',
+                        help="Write the full page text to a compressed archive instead of the Raw_Text sheet "
+                             "(default: <output>_text.ptxa)")
+    parser.add_argument('--word-boxes', action='store_true',
+                        help="Also store word positions in the text archive")
+    parser.add_argument('--replay', default=None, metavar='ARCHIVE',
+                        help="Skip OCR and rerun parsing from a text archive written with --text-archive")
+    parser.add_argument('--trace', type=int, default=0, metavar='N',
+                        help="With --replay, print the last N per-line parse decisions")
+    parser.add_argument('--source-name', default=None, metavar='NAME',
+                        help="Name recorded for the PDF in the summary and staff store (useful with '-')")
+    args = parser.parse_args()
     
-    # Get output path from command line argument (optional)
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    if args.pdf_path == '-' and not args.output_path:
+        parser.error("an output path is required when reading the PDF from stdin")
     
     # Create converter instance
-    converter = PDFToExcelConverter(pdf_path, output_path)
+    converter = PDFToExcelConverter(args.pdf_path, args.output_path, triage=args.triage,
+                                    searchable_path=args.searchable_pdf, workers=args.workers,
+                                    page_timeout=args.page_timeout, rss_limit_mb=args.max_rss_mb,
+                                    schema_path=args.schema, store_path=args.store,
+                                    text_archive_path=args.text_archive, archive_words=args.word_boxes,
+                                    check_tesseract=not args.replay, source_name=args.source_name)
     
     # Run conversion
-    converter.convert()
+    with converter:
+        if args.replay:
+            trace = converter.replay(archive_path=args.replay, trace_size=args.trace)
+            for line in format_trace(trace):
+                print(line)
+        else:
+            converter.convert()
 
 if __name__ == "__main__":
     main()
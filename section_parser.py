@@ -0,0 +1,284 @@
+"""
+Schema-driven parser for sectioned staff rosters.
+
+Sections are declared in a JSON file (see registry_schema.json): each one has
+anchor phrases that open it, the category headers it contains, lines to skip
+and an optional pattern for row lines. The schema is compiled once: all
+anchors of all sections go into a single regular expression, skip and end
+patterns into one alternation per section, and headers into a set per
+section, so the cost per line does not grow with the number of headers.
+
+Parsing is a single streaming pass. The open section and current header are
+kept between pages, so a list that continues over a page break stays under
+its header. A page only continues the open section when its first line is
+one of the section's headers or matches its continuation pattern (by default
+a name with a credential suffix); any other page closes the section.
+"""
+import json
+import os
+import re
+
+DEFAULT_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'registry_schema.json')
+
+# A name followed by a credential, e.g. "Melanie Herrick, RN"
+DEFAULT_CONTINUATION_PATTERN = r"^[A-Za-z][A-Za-z'.\-]*(?:\s+[A-Za-z][A-Za-z'.\-]*)+,\s*[A-Z][A-Za-z]{1,7}\b"
+
+
+def load_schema(path=None):
+    """
+    Load a section schema from a JSON file.
+
+    Args:
+        path (str): Schema file (defaults to registry_schema.json)
+
+    Returns:
+        dict: Parsed schema with a 'sections' list
+    """
+    with open(path or DEFAULT_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    if not schema.get('sections'):
+        raise ValueError(f"Schema {path or DEFAULT_SCHEMA_PATH} defines no sections")
+
+    for spec in schema['sections']:
+        name = spec.get('name')
+        if not name:
+            raise ValueError("Every schema section needs a name")
+        anchors = spec.get('anchors')
+        if not anchors:
+            raise ValueError(f"Section {name} has no anchors")
+        for anchor in anchors:
+            terms = [anchor] if isinstance(anchor, str) else anchor
+            # An empty phrase would match every line
+            if not terms or not all(isinstance(term, str) and term for term in terms):
+                raise ValueError(f"Section {name} has an empty anchor: {anchor!r}")
+        if not spec.get('headers'):
+            raise ValueError(f"Section {name} has no headers")
+    return schema
+
+
+def _alternation(patterns):
+    return re.compile('|'.join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+
+
+class CompiledSection:
+    """
+    One schema section with its patterns compiled.
+    """
+
+    def __init__(self, spec, looks_like_row):
+        self.name = spec['name']
+        self.anchors = [[anchor] if isinstance(anchor, str) else list(anchor) for anchor in spec['anchors']]
+        self.headers = list(spec['headers'])
+        self.header_set = set(self.headers)
+        self.header_suffix = spec.get('header_suffix', ':')
+        self.skip_regex = _alternation(spec.get('skip_patterns', []))
+        self.end_regex = _alternation(spec.get('end_patterns', []))
+        self.min_length = spec.get('min_length', 3)
+        self.continuation_regex = re.compile(spec.get('continuation_pattern') or DEFAULT_CONTINUATION_PATTERN)
+
+        row_pattern = spec.get('row_pattern')
+        self.looks_like_row = re.compile(row_pattern).search if row_pattern else looks_like_row
+
+    def header_name(self, line):
+        """
+        Return the header a line declares, or None.
+        """
+        suffix = self.header_suffix
+        if suffix:
+            if not line.endswith(suffix):
+                return None
+            line = line[:-len(suffix)].rstrip()
+        return line if line in self.header_set else None
+
+    def is_ignored(self, line):
+        """
+        Check whether a line is a separator or too short to mean anything.
+        """
+        return bool(self.skip_regex and self.skip_regex.search(line)) or len(line) < self.min_length
+
+    def continues(self, line):
+        """
+        Check whether a line at the top of a page belongs to this section.
+        """
+        return bool(self.header_name(line) or self.continuation_regex.search(line))
+
+
+class SectionParser:
+    def __init__(self, schema, looks_like_row):
+        """
+        Compile a schema into a streaming parser.
+
+        Args:
+            schema (dict): Schema from load_schema
+            looks_like_row (callable): Default check for row lines, used by
+                sections without a row_pattern
+        """
+        self.sections = [CompiledSection(spec, looks_like_row) for spec in schema['sections']]
+
+        # One regex for every anchor; the matching group names the section.
+        # An anchor matches a line that contains all of its phrases.
+        groups = []
+        self._anchor_sections = {}
+        for section_index, section in enumerate(self.sections):
+            for anchor_index, terms in enumerate(section.anchors):
+                group = f"a{section_index}_{anchor_index}"
+                lookaheads = ''.join(f"(?=.*?{re.escape(term)})" for term in terms)
+                groups.append(f"(?P<{group}>{lookaheads})")
+                self._anchor_sections[group] = section
+        self._anchor_regex = re.compile('|'.join(groups))
+
+        # Optional decision trace (e.g. a bounded collections.deque); each
+        # entry is (page, line, decision, section, header)
+        self.trace = None
+
+        self.reset()
+
+    @property
+    def header_columns(self):
+        """
+        All header names across sections, in schema order.
+        """
+        columns = []
+        for section in self.sections:
+            columns.extend(header for header in section.headers if header not in columns)
+        return columns
+
+    def reset(self):
+        """
+        Forget the open section, e.g. before parsing a new document.
+        """
+        self.section = None
+        self.current_header = None
+
+    def match_anchor(self, line):
+        """
+        Return the section a line opens, or None.
+        """
+        match = self._anchor_regex.match(line)
+        return self._anchor_sections[match.lastgroup] if match else None
+
+    def mentions_section(self, lines):
+        """
+        Check whether any line looks like a section anchor or header.
+
+        Used on noisy low-resolution OCR, so phrases are matched
+        case-insensitively and one phrase of an anchor is enough.
+
+        Args:
+            lines (list): Stripped, non-empty lines
+
+        Returns:
+            bool: True if a section seems to start or continue here
+        """
+        text = '\n'.join(lines).lower()
+        for section in self.sections:
+            if any(term.lower() in text for terms in section.anchors for term in terms):
+                return True
+            if any(section.header_name(line) for line in lines):
+                return True
+        return False
+
+    def parse_page(self, text, page_num):
+        """
+        Parse one page, continuing from the state left by the previous page.
+
+        Args:
+            text (str): Text content from the page
+            page_num (int): Zero-based page number
+
+        Returns:
+            list: List of dictionaries, one per row, with one column per
+                header of each section seen on the page
+        """
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        trace = self.trace
+        page = page_num + 1
+
+        # Only carry the open section over when the page picks up where the
+        # previous one stopped
+        if self.section is not None:
+            first_line = next((line for line in lines if not self.section.is_ignored(line)), None)
+            if first_line is None or not (self.match_anchor(first_line) or self.section.continues(first_line)):
+                if trace is not None:
+                    trace.append((page, first_line or '', 'closed', self.section.name, self.current_header))
+                self.reset()
+
+        # Names collected per section on this page, in order of appearance
+        page_data = {}
+        if self.section is not None:
+            page_data[self.section.name] = (self.section, {header: [] for header in self.section.headers})
+
+        for line in lines:
+            section = self.match_anchor(line)
+            if section is not None:
+                self.section = section
+                self.current_header = None
+                if section.name not in page_data:
+                    page_data[section.name] = (section, {header: [] for header in section.headers})
+                if trace is not None:
+                    trace.append((page, line, 'anchor', section.name, None))
+                continue
+
+            section = self.section
+            if section is None:
+                if trace is not None:
+                    trace.append((page, line, 'outside', None, None))
+                continue
+
+            if section.end_regex and section.end_regex.search(line):
+                if trace is not None:
+                    trace.append((page, line, 'end', section.name, self.current_header))
+                self.reset()
+                continue
+
+            # Check if this line is a header (ends with colon)
+            header_name = section.header_name(line)
+            if header_name:
+                self.current_header = header_name
+                if trace is not None:
+                    trace.append((page, line, 'header', section.name, header_name))
+                continue
+
+            # Skip separator lines (underscores) and very short lines
+            if section.skip_regex and section.skip_regex.search(line):
+                if trace is not None:
+                    trace.append((page, line, 'separator', section.name, self.current_header))
+                continue
+            if len(line) < section.min_length:
+                if trace is not None:
+                    trace.append((page, line, 'short', section.name, self.current_header))
+                continue
+
+            if self.current_header and section.looks_like_row(line):
+                page_data[section.name][1][self.current_header].append(line)
+                decision = 'row'
+            else:
+                decision = 'other'
+            if trace is not None:
+                trace.append((page, line, decision, section.name, self.current_header))
+
+        return self._build_rows(page_data, page_num)
+
+    def _build_rows(self, page_data, page_num):
+        """
+        Align each section's lists side by side into rows.
+        """
+        result = []
+        multiple_sections = len(self.sections) > 1
+
+        for section, staff_data in page_data.values():
+            max_length = max(len(names) for names in staff_data.values()) if any(staff_data.values()) else 0
+
+            for row_idx in range(max_length):
+                row_data = {'Row_Number': row_idx + 1, 'Page': page_num + 1}
+                if multiple_sections:
+                    row_data['Section'] = section.name
+                for header in section.headers:
+                    if row_idx < len(staff_data[header]):
+                        row_data[header] = staff_data[header][row_idx]
+                    else:
+                        row_data[header] = ''
+                result.append(row_data)
+
+        return result
@@ -1,28 +1,30 @@
-import pandas as pd
+import sys
 
-def show_all_rows():
-    excel_path = "Document250616132824_v3.xlsx"
-    
-    df = pd.read_excel(excel_path, sheet_name='Registry_Staff')
+from inspect_excel import open_rows, is_empty
+
+def show_all_rows(excel_path="Document250616132824_v3.xlsx"):
+    columns, rows, _ = open_rows(excel_path, 'Registry_Staff')
     
     print("=== ALL STAFF DATA ===")
-    print(f"Total rows: {len(df)}")
-    print()
     
     # Show all data with row numbers
     staff_cols = ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']
+    indexes = [columns.index(col) if col in columns else None for col in staff_cols]
     
     print("Row | TheraEX | Intuitive | Vitawerks | Vitawerks Cont")
     print("-" * 100)
     
-    for idx, row in df.iterrows():
-        row_num = idx + 1
-        theraex = row['TheraEX'] if pd.notna(row['TheraEX']) and row['TheraEX'] != '' else ''
-        intuitive = row['Intuitive'] if pd.notna(row['Intuitive']) and row['Intuitive'] != '' else ''
-        vitawerks = row['Vitawerks'] if pd.notna(row['Vitawerks']) and row['Vitawerks'] != '' else ''
-        vitawerks_cont = row['Vitawerks Cont'] if pd.notna(row['Vitawerks Cont']) and row['Vitawerks Cont'] != '' else ''
+    total = 0
+    for row_num, row in enumerate(rows, 1):
+        total = row_num
+        theraex, intuitive, vitawerks, vitawerks_cont = (
+            '' if i is None or i >= len(row) or is_empty(row[i]) else str(row[i]) for i in indexes
+        )
         
         print(f"{row_num:2d}  | {theraex:20s} | {intuitive:20s} | {vitawerks:25s} | {vitawerks_cont}")
+    
+    print()
+    print(f"Total rows: {total}")
 
 if __name__ == "__main__":
-    show_all_rows()
+    show_all_rows(*sys.argv[1:2])
@@ -1,48 +1,50 @@
-import pandas as pd
+import sys
 
-def show_complete_data():
-    excel_path = "Document250616132824_v3.xlsx"
-    
+from inspect_excel import open_rows, scan_rows, is_empty
+
+def show_complete_data(excel_path="Document250616132824_v3.xlsx"):
     try:
-        df = pd.read_excel(excel_path, sheet_name='Registry_Staff')
+        columns, rows, _ = open_rows(excel_path, 'Registry_Staff')
         
-        print("=== COMPLETE REGISTRY STAFF DATA ===")
-        print(f"Total rows: {len(df)}")
-        print()
+        # Show only the relevant columns (skip Row_Number and Page)
+        staff_cols = [col for col in ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont'] if col in columns]
+        indexes = [columns.index(col) for col in staff_cols]
+        staff_lists = {col: [] for col in staff_cols}
         
-        # Set pandas to show all rows and columns
-        pd.set_option('display.max_rows', None)
-        pd.set_option('display.max_columns', None)
-        pd.set_option('display.width', None)
-        pd.set_option('display.max_colwidth', None)
+        # Collect names while keeping the last 10 rows in the same pass
+        def collect(rows):
+            for row in rows:
+                for col, i in zip(staff_cols, indexes):
+                    if i < len(row) and not is_empty(row[i]):
+                        staff_lists[col].append(row[i])
+                yield row
         
-        # Show only the relevant columns (skip Row_Number and Page)
-        staff_cols = ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']
+        result = scan_rows(columns, collect(rows), tail=10)
+        
+        print("=== COMPLETE REGISTRY STAFF DATA ===")
+        print(f"Total rows: {result['total']}")
+        print()
         
         print("All staff by category:")
         print("-" * 80)
         
         for col in staff_cols:
-            if col in df.columns:
-                # Get non-empty values
-                staff_list = df[col].dropna()
-                staff_list = staff_list[staff_list != '']
-                
-                print(f"\n{col}: ({len(staff_list)} people)")
-                for i, name in enumerate(staff_list, 1):
-                    print(f"  {i:2d}. {name}")
+            staff_list = staff_lists[col]
+            print(f"\n{col}: ({len(staff_list)} people)")
+            for i, name in enumerate(staff_list, 1):
+                print(f"  {i:2d}. {name}")
         
         print(f"\n=== VERIFICATION ===")
         print("Let's check the last few rows to see if data is complete:")
         print()
         
         # Show last 10 rows
-        last_rows = df[['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']].tail(10)
+        first_tail_row = result['total'] - len(result['tail'])
         print("Last 10 rows:")
-        for idx, row in last_rows.iterrows():
+        for idx, row in enumerate(result['tail'], first_tail_row):
             print(f"Row {idx + 1}: ", end="")
-            for col in staff_cols:
-                val = row[col] if pd.notna(row[col]) and row[col] != '' else '(empty)'
+            for col, i in zip(staff_cols, indexes):
+                val = str(row[i]) if i < len(row) and not is_empty(row[i]) else '(empty)'
                 print(f"{col}: {val[:20]:<20} ", end="")
             print()
         
@@ -50,4 +52,4 @@ def show_complete_data():
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    show_complete_data()
+    show_complete_data(*sys.argv[1:2])
@@ -1,5 +1,7 @@
-import pandas as pd
 import os
+import sys
+
+from inspect_excel import open_workbook, sheet_rows, scan_rows, format_row, category_columns
 
 def display_excel_structure(excel_path):
     """Display the structure of the created Excel file."""
@@ -9,45 +11,52 @@ def display_excel_structure(excel_path):
         return
     
     try:
-        # Read all sheets
-        excel_file = pd.ExcelFile(excel_path)
+        # Open the workbook once and stream each sheet in order
+        workbook = open_workbook(excel_path)
+    except Exception as e:
+        print(f"Error reading Excel file: {e}")
+        return
+    
+    try:
         print(f"Excel File: {excel_path}")
-        print(f"Sheets: {excel_file.sheet_names}")
+        print(f"Sheets: {workbook.sheetnames}")
         print("=" * 60)
         
-        for sheet_name in excel_file.sheet_names:
+        for worksheet in workbook.worksheets:
+            sheet_name = worksheet.title
             print(f"\n SHEET: {sheet_name}")
             print("-" * 40)
             
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-            print(f"Rows: {len(df)}")
-            print(f"Columns: {list(df.columns)}")
+            show_all = sheet_name == 'Summary'
+            columns, rows = sheet_rows(worksheet)
+            result = scan_rows(columns, rows, head=sys.maxsize if show_all else 10)
+            print(f"Rows: {result['total']}")
+            print(f"Columns: {columns}")
             
             if sheet_name == 'Registry_Staff':
                 print("\n SAMPLE DATA:")
                 
                 # Show header counts
-                registry_cols = ['TheraEX', 'Intuitive', 'Vitawerks', 'Vitawerks Cont']
-                for col in registry_cols:
-                    if col in df.columns:
-                        non_empty = len(df[df[col].notna() & (df[col] != '')])
-                        print(f"  {col}: {non_empty} staff members")
+                for col in category_columns(columns):
+                    print(f"  {col}: {result['counts'][col]} staff members")
                 
                 print(f"\n First 10 rows:")
-                pd.set_option('display.max_columns', None)
-                pd.set_option('display.width', None)
-                print(df.head(10).to_string(index=False))
+                print(format_row(columns))
+                for row in result['head']:
+                    print(format_row(row))
                 
-            elif sheet_name == 'Summary':
+            elif show_all:
                 print(f"\nSUMMARY DATA:")
-                print(df.to_string(index=False))
+                for row in result['head']:
+                    print(format_row(row))
             
             print()
         
     except Exception as e:
         print(f"Error reading Excel file: {e}")
+    finally:
+        workbook.close()
 
 if __name__ == "__main__":
-    import sys
     excel_path = sys.argv[1] if len(sys.argv) > 1 else "Document250616132824_v3.xlsx"
     display_excel_structure(excel_path)
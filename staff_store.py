@@ -0,0 +1,313 @@
+"""
+Local SQLite index of extracted staff records.
+
+Every converted document's rows are upserted with their source file, page,
+category and a normalized name, so questions like "which documents list this
+clinician?" are answered from indexes instead of by re-opening workbooks.
+A full-text (FTS5) table over the normalized names supports word and prefix
+searches. Rows from generic table detection are not names; they are kept in
+a separate table_rows table and stay out of the name indexes.
+
+Usage:
+    python staff_store.py query staff.db "Melanie Herrick"
+    python staff_store.py query staff.db "herr" --category TheraEX
+    python staff_store.py query staff.db "melanie herrick" --exact
+    python staff_store.py stats staff.db
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL UNIQUE,
+    record_count INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS staff_records (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_staff_records_normalized ON staff_records(normalized_name);
+CREATE INDEX IF NOT EXISTS idx_staff_records_category ON staff_records(category, normalized_name);
+CREATE INDEX IF NOT EXISTS idx_staff_records_document ON staff_records(document_id);
+CREATE TABLE IF NOT EXISTS table_rows (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_table_rows_document ON table_rows(document_id);
+"""
+
+# The FTS table mirrors staff_records. It is updated with one statement per
+# document in upsert_document rather than per-row triggers, which keeps bulk
+# inserts fast.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS staff_fts USING fts5(
+    normalized_name, content='staff_records', content_rowid='id'
+);
+"""
+
+# Credentials stripped from the end of a name, matched case-insensitively.
+# Only listed credentials count, so "Doe, Jane" keeps its first name; DO and
+# MA are left out because they are also surnames ("Lee, Do").
+CREDENTIALS = [
+    'RN', 'LVN', 'LPN', 'CNA', 'CMA', 'MD', 'NP', 'FNP', 'APRN', 'CRNA', 'CNS', 'PA-C', 'PA',
+    'RT', 'RRT', 'RPh', 'PharmD', 'DPT', 'PT', 'PTA', 'OT', 'OTR', 'COTA', 'SLP', 'BSN', 'MSN', 'DNP',
+    'PhD', 'PsyD', 'LCSW', 'MSW', 'EMT',
+]
+CREDENTIAL_REGEX = re.compile(
+    r"^(?:%s)\b" % '|'.join(re.escape(credential) for credential in sorted(CREDENTIALS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+
+def normalize_name(name):
+    """
+    Normalize a staff name for lookups.
+
+    Credentials after trailing commas are dropped, the rest is lowercased and
+    punctuation other than hyphens and apostrophes becomes whitespace. Text
+    after a comma that is not a credential ("Herrick, Melanie") is kept.
+
+    Args:
+        name (str): Name as extracted, e.g. "Melanie Herrick, RN"
+
+    Returns:
+        str: Normalized name, e.g. "melanie herrick"
+    """
+    name = str(name)
+    # "Jane Doe, RN, BSN" carries more than one credential
+    while ',' in name:
+        base, credential = name.rsplit(',', 1)
+        if not (base.strip() and CREDENTIAL_REGEX.match(credential.strip())):
+            break
+        name = base
+    name = re.sub(r"[^\w'\- ]+", ' ', name.lower())
+    return ' '.join(name.split())
+
+
+def records_from_rows(rows, categories):
+    """
+    Turn registry rows into (page, category, name) records.
+
+    Args:
+        rows (list): Row dictionaries from _parse_registry_staff; table
+            rows from detect_table_structure are skipped
+        categories (list): Column names that hold staff names
+
+    Returns:
+        list: (page, category, name) tuples
+    """
+    records = []
+    for row in rows:
+        if row.get('Row_Type') == 'Data':
+            continue
+        page = row.get('Page')
+        for category in categories:
+            value = row.get(category)
+            if value:
+                records.append((page, category, str(value)))
+    return records
+
+
+def table_rows_from_rows(rows):
+    """
+    Turn detect_table_structure rows into (page, content) entries.
+
+    Args:
+        rows (list): Row dictionaries; only table rows are used
+
+    Returns:
+        list: (page, content) tuples with the cells joined by ' | '
+    """
+    table_rows = []
+    for row in rows:
+        if row.get('Row_Type') != 'Data':
+            continue
+        cells = [str(value) for key, value in row.items() if key.startswith('Column_') and value]
+        if cells:
+            table_rows.append((row.get('Page'), ' | '.join(cells)))
+    return table_rows
+
+
+class StaffStore:
+    def __init__(self, db_path):
+        """
+        Open (and create if needed) a staff record store.
+
+        Args:
+            db_path (str): SQLite database file
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable ({e}), falling back to prefix lookups")
+            self.has_fts = False
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def upsert_document(self, source_file, records, table_rows=()):
+        """
+        Replace all records of one document in a single transaction.
+
+        Args:
+            source_file (str): Source PDF path
+            records (list): (page, category, name) tuples
+            table_rows (list): (page, content) tuples from table detection
+
+        Returns:
+            int: Number of records stored
+        """
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO documents (source_file, record_count, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(source_file) DO UPDATE SET record_count = excluded.record_count, '
+                'updated_at = excluded.updated_at',
+                (source_file, len(records), time.time())
+            )
+            document_id = self.conn.execute(
+                'SELECT id FROM documents WHERE source_file = ?', (source_file,)
+            ).fetchone()[0]
+
+            if self.has_fts:
+                self.conn.execute(
+                    "INSERT INTO staff_fts(staff_fts, rowid, normalized_name) "
+                    "SELECT 'delete', id, normalized_name FROM staff_records WHERE document_id = ?",
+                    (document_id,)
+                )
+            self.conn.execute('DELETE FROM staff_records WHERE document_id = ?', (document_id,))
+            self.conn.executemany(
+                'INSERT INTO staff_records (document_id, page, category, name, normalized_name) '
+                'VALUES (?, ?, ?, ?, ?)',
+                ((document_id, page, category, name, normalize_name(name)) for page, category, name in records)
+            )
+            self.conn.execute('DELETE FROM table_rows WHERE document_id = ?', (document_id,))
+            self.conn.executemany(
+                'INSERT INTO table_rows (document_id, page, content) VALUES (?, ?, ?)',
+                ((document_id, page, content) for page, content in table_rows)
+            )
+            if self.has_fts:
+                self.conn.execute(
+                    'INSERT INTO staff_fts(rowid, normalized_name) '
+                    'SELECT id, normalized_name FROM staff_records WHERE document_id = ?',
+                    (document_id,)
+                )
+        return len(records)
+
+    def lookup(self, query, category=None, exact=False, limit=100):
+        """
+        Find records by name.
+
+        Args:
+            query (str): Name or part of a name
+            category (str): Only records in this category (optional)
+            exact (bool): Match the whole normalized name instead of words
+            limit (int): Maximum number of records
+
+        Returns:
+            list: (source_file, page, category, name) tuples
+        """
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+
+        select = ('SELECT d.source_file, r.page, r.category, r.name FROM staff_records r '
+                  'JOIN documents d ON d.id = r.document_id ')
+        params = []
+
+        if exact:
+            where = 'WHERE r.normalized_name = ?'
+            params.append(normalized)
+        elif self.has_fts:
+            # Every word must match, the last one as a prefix
+            terms = [f'"{term}"' for term in normalized.split()]
+            terms[-1] += '*'
+            where = 'WHERE r.id IN (SELECT rowid FROM staff_fts WHERE staff_fts MATCH ?)'
+            params.append(' '.join(terms))
+        else:
+            where = 'WHERE r.normalized_name LIKE ?'
+            params.append(normalized.replace('%', '') + '%')
+
+        if category:
+            where += ' AND r.category = ?'
+            params.append(category)
+
+        params.append(limit)
+        return self.conn.execute(f"{select}{where} ORDER BY d.source_file, r.page LIMIT ?", params).fetchall()
+
+    def stats(self):
+        """
+        Return (documents, records, table_rows) counts.
+        """
+        documents = self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+        records = self.conn.execute('SELECT COUNT(*) FROM staff_records').fetchone()[0]
+        table_rows = self.conn.execute('SELECT COUNT(*) FROM table_rows').fetchone()[0]
+        return documents, records, table_rows
+
+
+def main():
+    """
+    Command line entry point for querying a store.
+    """
+    parser = argparse.ArgumentParser(description="Query the local index of extracted staff records.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = subparsers.add_parser('query', help="Find documents that list a name")
+    query_parser.add_argument('db_path')
+    query_parser.add_argument('name')
+    query_parser.add_argument('--category', default=None, help="Only this category (e.g. TheraEX)")
+    query_parser.add_argument('--exact', action='store_true', help="Match the whole normalized name")
+    query_parser.add_argument('--limit', type=int, default=100)
+
+    stats_parser = subparsers.add_parser('stats', help="Show document and record counts")
+    stats_parser.add_argument('db_path')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"Store not found: {args.db_path}")
+        sys.exit(1)
+
+    with StaffStore(args.db_path) as store:
+        if args.command == 'stats':
+            documents, records, table_rows = store.stats()
+            print(f"Documents: {documents}")
+            print(f"Records: {records}")
+            print(f"Table rows: {table_rows}")
+            return
+
+        start = time.perf_counter()
+        results = store.lookup(args.name, category=args.category, exact=args.exact, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        for source_file, page, category, name in results:
+            print(f"{os.path.basename(source_file)} | page {page} | {category} | {name}")
+        print(f"{len(results)} record(s) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
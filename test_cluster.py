@@ -0,0 +1,93 @@
+"""
+End-to-end check of the shard queue with several local worker processes.
+
+Run with: python -m pytest test_cluster.py
+"""
+import os
+import stat
+
+import fitz  # PyMuPDF
+import pytest
+from openpyxl import load_workbook
+
+import pdf_to_excel_cluster as cluster
+
+
+@pytest.fixture
+def tesseract_on_path(tmp_path, monkeypatch):
+    # Text PDFs never reach OCR, but the converter checks for the binary
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    tesseract = bin_dir / 'tesseract'
+    tesseract.write_text('#!/bin/sh\nexit 0\n')
+    tesseract.chmod(tesseract.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+
+def _text_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_publish_workers_merge(tmp_path, tesseract_on_path):
+    queue_dir = str(tmp_path / 'queue')
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    _text_pdf(tmp_path / 'a.pdf', [f"Item {i}  Qty {i * 2}" for i in range(1, 6)])
+    _text_pdf(tmp_path / 'b.pdf', [f"Part {i}  Cost {i * 3}" for i in range(1, 4)])
+
+    published = cluster.publish(queue_dir, [str(tmp_path / 'a.pdf'), str(tmp_path / 'b.pdf')],
+                                shard_size=2, output_dir=str(output_dir))
+    assert published == 5
+
+    cluster.run_local_workers(queue_dir, 3)
+    assert os.listdir(os.path.join(queue_dir, 'pending')) == []
+    assert os.listdir(os.path.join(queue_dir, 'leased')) == []
+    assert len(os.listdir(os.path.join(queue_dir, 'done'))) == 5
+
+    written = cluster.merge(queue_dir)
+    assert sorted(os.path.basename(path) for path in written) == ['a.xlsx', 'b.xlsx']
+
+    workbook = load_workbook(output_dir / 'a.xlsx', read_only=True)
+    rows = list(workbook['Registry_Staff'].iter_rows(min_row=2, values_only=True))
+    workbook.close()
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+
+
+def test_expired_worker_leaves_new_lease_alone(tmp_path, tesseract_on_path):
+    queue_dir = str(tmp_path / 'queue')
+    _text_pdf(tmp_path / 'a.pdf', ["Item 1  Qty 2"])
+    cluster.publish(queue_dir, [str(tmp_path / 'a.pdf')], shard_size=1)
+
+    old_lease, shard = cluster.claim_shard(queue_dir)
+    assert cluster.requeue_expired(queue_dir, lease_timeout=0) == 1
+    new_lease, _ = cluster.claim_shard(queue_dir)
+    assert new_lease != old_lease
+
+    # The expired worker fails; the new owner's lease must stay in place
+    shard['pdf_path'] = str(tmp_path / 'missing.pdf')
+    assert not cluster.process_shard(queue_dir, old_lease, shard)
+    assert os.path.exists(new_lease)
+    assert os.listdir(os.path.join(queue_dir, 'pending')) == []
+    assert os.listdir(os.path.join(queue_dir, 'failed')) == []
+
+
+def test_shard_of_dying_worker_ends_in_failed(tmp_path, capsys):
+    queue_dir = str(tmp_path / 'queue')
+    _text_pdf(tmp_path / 'a.pdf', ["Item 1  Qty 2"])
+    cluster.publish(queue_dir, [str(tmp_path / 'a.pdf')], shard_size=1)
+
+    # Every worker that claims the shard dies without renewing its lease
+    for _ in range(cluster.MAX_ATTEMPTS):
+        lease_path, shard = cluster.claim_shard(queue_dir)
+        assert shard is not None
+        assert cluster.requeue_expired(queue_dir, lease_timeout=0) == 1
+
+    assert os.listdir(os.path.join(queue_dir, 'pending')) == []
+    assert len(os.listdir(os.path.join(queue_dir, 'failed'))) == 1
+
+    assert cluster.merge(queue_dir) == []
+    assert 'Failed: a.pdf' in capsys.readouterr().out
@@ -0,0 +1,36 @@
+"""
+Regression checks for section continuation across pages.
+
+Run with: python -m pytest test_section_parser.py
+"""
+from pdf_to_excel_pymupdf import PDFToExcelConverter
+
+REGISTRY_PAGE = (
+    "Registry Staff who are not in Qgenda\n"
+    "TheraEX:\n"
+    "Melanie Herrick, RN\n"
+    "Vitawerks Cont:\n"
+    "Maria Vargas, CNA\n"
+)
+
+
+def _parse(pages):
+    converter = PDFToExcelConverter(b'', 'unused.xlsx', check_tesseract=False)
+    return converter.parse_text_to_structured_data(pages)
+
+
+def test_page_without_anchor_after_roster_falls_back_to_generic():
+    rows = _parse([REGISTRY_PAGE, "Some other page\nJohn Smith\nfoo bar baz", REGISTRY_PAGE])
+
+    page_two = [row for row in rows if row['Page'] == 2]
+    assert [row.get('Content') for row in page_two] == ["Some other page", "John Smith", "foo bar baz"]
+    assert not any(row.get('Vitawerks Cont') for row in page_two)
+    assert [row['Vitawerks Cont'] for row in rows if row['Page'] == 3] == ["Maria Vargas, CNA"]
+
+
+def test_roster_continues_over_page_break():
+    rows = _parse([REGISTRY_PAGE, "Ebonie Woods, CNA\nHafsatu Bah, CNA\nIntuitive:\nRobin Pehle, LVN"])
+
+    page_two = [row for row in rows if row['Page'] == 2]
+    assert [row['Vitawerks Cont'] for row in page_two] == ["Ebonie Woods, CNA", "Hafsatu Bah, CNA"]
+    assert page_two[0]['Intuitive'] == "Robin Pehle, LVN"
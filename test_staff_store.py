@@ -0,0 +1,63 @@
+"""
+Checks for name normalization and the SQLite staff record store.
+
+Run with: python -m pytest test_staff_store.py
+"""
+import pytest
+
+from staff_store import StaffStore, normalize_name, records_from_rows, table_rows_from_rows
+
+
+@pytest.mark.parametrize('name, expected', [
+    ("Melanie Herrick, RN", 'melanie herrick'),
+    ("melanie herrick, rn", 'melanie herrick'),
+    ("Jane Doe, RN, BSN", 'jane doe'),
+    ("Amy Lee, PA-C", 'amy lee'),
+    ("Herrick, Melanie", 'herrick melanie'),
+    ("DOE, JANE", 'doe jane'),
+    ("SMITH, JO", 'smith jo'),
+    ("Lee, Do", 'lee do'),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+@pytest.fixture
+def store(tmp_path):
+    with StaffStore(str(tmp_path / 'staff.db')) as store:
+        yield store
+
+
+def test_upsert_replaces_document(store):
+    store.upsert_document('a.pdf', [(1, 'TheraEX', "Melanie Herrick, RN"), (1, 'TheraEX', "Maria Vargas, CNA")])
+    store.upsert_document('b.pdf', [(2, 'Intuitive', "Robin Pehle, LVN")])
+    assert store.stats() == (2, 3, 0)
+
+    store.upsert_document('a.pdf', [(3, 'Vitawerks Cont', "Ebonie Woods, CNA")], table_rows=[(4, "Item | 2")])
+    assert store.stats() == (2, 2, 1)
+    assert store.lookup("maria") == []
+    assert store.lookup("ebonie") == [('a.pdf', 3, 'Vitawerks Cont', "Ebonie Woods, CNA")]
+
+
+def test_table_rows_are_not_names(store):
+    rows = [
+        {'Page': 1, 'TheraEX': "Melanie Herrick, RN"},
+        {'Page': 2, 'Row_Type': 'Data', 'Column_1': "Melanie", 'Column_2': "42"},
+    ]
+    store.upsert_document('a.pdf', records_from_rows(rows, ['TheraEX']), table_rows_from_rows(rows))
+
+    assert store.stats() == (1, 1, 1)
+    assert store.lookup("melanie") == [('a.pdf', 1, 'TheraEX', "Melanie Herrick, RN")]
+
+
+def test_lookup(store):
+    store.upsert_document('a.pdf', [
+        (1, 'TheraEX', "Melanie Herrick, RN"),
+        (2, 'Intuitive', "Melanie Herrickson, LVN"),
+        (2, 'Intuitive', "Robin Pehle, LVN"),
+    ])
+
+    assert [row[3] for row in store.lookup("herr")] == ["Melanie Herrick, RN", "Melanie Herrickson, LVN"]
+    assert [row[3] for row in store.lookup("melanie herrick, rn", exact=True)] == ["Melanie Herrick, RN"]
+    assert [row[3] for row in store.lookup("melanie", category='Intuitive')] == ["Melanie Herrickson, LVN"]
+    assert store.lookup(", RN") == []
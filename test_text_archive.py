@@ -0,0 +1,85 @@
+"""
+Round trip and command line checks for the page text archive.
+
+Run with: python -m pytest test_text_archive.py
+"""
+import sys
+import zlib
+
+import pytest
+
+import text_archive
+from pdf_to_excel_pymupdf import PDFToExcelConverter
+from text_archive import ENTRY, HEADER_V1, MAGIC_V1, TextArchive, file_digest, write_archive
+
+PAGES = ["Registry Staff who are not in Qgenda\nMelanie Herrick, RN", "", "Page three – café"]
+WORDS = {0: [[72.0, 60.5, 140.25, 74.0, "Registry"], [144.0, 60.5, 180.0, 74.0, "Staff"]]}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'pages.ptxa')
+    write_archive(path, PAGES, WORDS)
+
+    with TextArchive(path) as archive:
+        assert len(archive) == 3
+        assert archive.text_pages() == PAGES
+        assert archive.page_words(0) == WORDS[0]
+        assert archive.page_words(1) == []
+        assert archive.page_text(1) == ""
+        assert archive.text_length(2) == len(PAGES[2].encode('utf-8'))
+        with pytest.raises(IndexError):
+            archive.page_text(3)
+
+
+def test_source_digest(tmp_path):
+    pdf = tmp_path / 'a.pdf'
+    pdf.write_bytes(b'%PDF-1.4 stand-in')
+    path = str(tmp_path / 'pages.ptxa')
+
+    write_archive(path, PAGES, source_digest=file_digest(str(pdf)))
+    with TextArchive(path) as archive:
+        assert archive.source_digest == file_digest(str(pdf))
+
+    write_archive(path, PAGES)
+    with TextArchive(path) as archive:
+        assert archive.source_digest is None
+
+
+def test_reads_archive_without_digest(tmp_path):
+    # Layout written before the header carried a source digest
+    raw = "Melanie Herrick, RN".encode('utf-8')
+    blob = zlib.compress(raw)
+    offset = HEADER_V1.size + ENTRY.size
+    path = tmp_path / 'old.ptxa'
+    path.write_bytes(HEADER_V1.pack(MAGIC_V1, 1) + ENTRY.pack(offset, len(blob), len(raw), 0, 0) + blob)
+
+    with TextArchive(str(path)) as archive:
+        assert archive.text_pages() == ["Melanie Herrick, RN"]
+        assert archive.source_digest is None
+
+
+def test_page_outside_archive_exits(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / 'pages.ptxa')
+    write_archive(path, PAGES)
+    monkeypatch.setattr(sys, 'argv', ['text_archive.py', path, '--page', '5'])
+
+    with pytest.raises(SystemExit) as exit_info:
+        text_archive.main()
+    assert exit_info.value.code == 1
+    assert "Page 5 not in archive (3 pages)" in capsys.readouterr().out
+
+
+def test_replay_into_other_archive_keeps_word_boxes(tmp_path):
+    source = str(tmp_path / 'source.ptxa')
+    target = str(tmp_path / 'target.ptxa')
+    write_archive(source, PAGES, WORDS, source_digest='ab' * 32)
+
+    converter = PDFToExcelConverter(b'', str(tmp_path / 'out.xlsx'), check_tesseract=False,
+                                    text_archive_path=target)
+    with converter:
+        converter.replay(archive_path=source)
+
+    with TextArchive(target) as archive:
+        assert archive.text_pages() == PAGES
+        assert archive.page_words(0) == WORDS[0]
+        assert archive.source_digest == 'ab' * 32
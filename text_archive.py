@@ -0,0 +1,226 @@
+"""
+Compressed archive of full per-page text with random page access.
+
+Layout (little endian):
+    header   8s magic, I page count, 32s SHA-256 of the source PDF
+             (all zero if unknown; PTXARC01 archives have no digest)
+    index    one entry per page: Q text offset, I compressed length,
+             I text length, Q words offset, I compressed length
+    blobs    zlib-compressed page text (UTF-8) and optional word boxes (JSON)
+
+The index sits at a fixed position, so a reader memory-maps the file and
+decompresses only the page it needs.
+
+Usage:
+    python text_archive.py output_text.ptxa              # list pages
+    python text_archive.py output_text.ptxa --page 3     # print page 3
+    python text_archive.py output_text.ptxa --page 3 --words
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b'PTXARC02'
+HEADER = struct.Struct('<8sI32s')
+# Archives written before the source digest was added
+MAGIC_V1 = b'PTXARC01'
+HEADER_V1 = struct.Struct('<8sI')
+ENTRY = struct.Struct('<QIIQI')
+
+ARCHIVE_EXTENSION = '.ptxa'
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file, read in chunks.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_archive(path, text_pages, page_words=None, level=6, source_digest=None):
+    """
+    Write page text (and optionally word boxes) to an archive.
+
+    Args:
+        path (str): Archive path
+        text_pages (list): Text content of each page
+        page_words (dict): Page index -> list of [x0, y0, x1, y1, text]
+            word boxes in page coordinates (optional)
+        level (int): zlib compression level
+        source_digest (str): Hex SHA-256 of the PDF the text came from
+            (optional), so readers can tell whether the archive is current
+
+    Returns:
+        int: Size of the archive in bytes
+    """
+    page_words = page_words or {}
+    blobs = []
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(text_pages)
+
+    for page_num, text in enumerate(text_pages):
+        raw_text = (text or '').encode('utf-8')
+        text_blob = zlib.compress(raw_text, level)
+        text_offset = offset
+        offset += len(text_blob)
+        blobs.append(text_blob)
+
+        words_offset, words_length = 0, 0
+        if page_words.get(page_num):
+            words_blob = zlib.compress(json.dumps(page_words[page_num]).encode('utf-8'), level)
+            words_offset, words_length = offset, len(words_blob)
+            offset += len(words_blob)
+            blobs.append(words_blob)
+
+        entries.append(ENTRY.pack(text_offset, len(text_blob), len(raw_text), words_offset, words_length))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(text_pages), bytes.fromhex(source_digest or '')))
+        f.write(b''.join(entries))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return offset
+
+
+class TextArchive:
+    def __init__(self, path):
+        """
+        Open an archive for random page access.
+
+        Args:
+            path (str): Archive path
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = self._map[:len(MAGIC)]
+        if magic == MAGIC:
+            _, self.page_count, digest = HEADER.unpack_from(self._map, 0)
+            self._index_offset = HEADER.size
+            # Hex SHA-256 of the source PDF, or None if it was not recorded
+            self.source_digest = digest.hex() if digest.strip(b'\0') else None
+        elif magic == MAGIC_V1:
+            _, self.page_count = HEADER_V1.unpack_from(self._map, 0)
+            self._index_offset = HEADER_V1.size
+            self.source_digest = None
+        else:
+            self.close()
+            raise ValueError(f"Not a page text archive: {path}")
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.page_count
+
+    def _entry(self, page_num):
+        if not 0 <= page_num < self.page_count:
+            raise IndexError(f"Page {page_num + 1} not in archive ({self.page_count} pages)")
+        return ENTRY.unpack_from(self._map, self._index_offset + ENTRY.size * page_num)
+
+    def text_length(self, page_num):
+        """
+        Length of a page's text in bytes, read from the index only.
+        """
+        return self._entry(page_num)[2]
+
+    def page_text(self, page_num):
+        """
+        Return the full text of one page.
+
+        Args:
+            page_num (int): Zero-based page number
+
+        Returns:
+            str: Page text
+        """
+        offset, length, _, _, _ = self._entry(page_num)
+        return zlib.decompress(self._map[offset:offset + length]).decode('utf-8')
+
+    def page_words(self, page_num):
+        """
+        Return the word boxes stored for one page.
+
+        Args:
+            page_num (int): Zero-based page number
+
+        Returns:
+            list: [x0, y0, x1, y1, text] entries, empty if none were stored
+        """
+        _, _, _, offset, length = self._entry(page_num)
+        if not length:
+            return []
+        return json.loads(zlib.decompress(self._map[offset:offset + length]).decode('utf-8'))
+
+    def text_pages(self):
+        """
+        Return the text of every page, in order.
+        """
+        return [self.page_text(page_num) for page_num in range(self.page_count)]
+
+
+def main():
+    """
+    Command line entry point for reading an archive.
+    """
+    parser = argparse.ArgumentParser(description="Read pages from a page text archive.")
+    parser.add_argument('archive')
+    parser.add_argument('--page', type=int, default=None, help="1-based page to print")
+    parser.add_argument('--words', action='store_true', help="Print word boxes instead of text")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"Archive not found: {args.archive}")
+        sys.exit(1)
+
+    try:
+        archive = TextArchive(args.archive)
+    except ValueError as e:
+        print(f"Cannot read archive: {e}")
+        sys.exit(1)
+
+    with archive:
+        try:
+            if args.page is None:
+                print(f"{args.archive}: {len(archive)} pages")
+                print(f"  Source SHA-256: {archive.source_digest or 'not recorded'}")
+                for page_num in range(len(archive)):
+                    print(f"  Page {page_num + 1}: {archive.text_length(page_num)} bytes of text")
+            elif args.words:
+                for x0, y0, x1, y1, text in archive.page_words(args.page - 1):
+                    print(f"{x0:8.1f} {y0:8.1f} {x1:8.1f} {y1:8.1f}  {text}")
+            else:
+                print(archive.page_text(args.page - 1))
+        except IndexError as e:
+            print(e)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()